@@ -9,16 +9,25 @@ import json
 import time
 import logging
 import argparse
-import pandas as pd
-from typing import List, Dict, Any
+import copy
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 # 导入自定义模块
-from spider.spider import ArticleSpider
+from spider.spider import ArticleSpider, write_articles_csv
 from spider.proxy_pool import ProxyPool
-from nlp.segmentation import create_segmenter
-from nlp.tfidf import TFIDFExtractor
-from nlp.entity import create_entity_extractor
-from nlp.relation import create_relation_extractor
+# NLP模块（jieba词典、HanLP/LTP模型）加载较慢，在实际需要时才导入
+
+# 尝试导入orjson（可选，用于加速实体和三元组结果的序列化）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # 设置日志
 logging.basicConfig(
@@ -27,6 +36,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger('main')
 
+# NLP结果缓存版本，提取逻辑或结果格式变化时递增，使旧的缓存结果失效
+NLP_CACHE_VERSION = 1
+# NLP结果缓存最多保留的条目数，超出时淘汰最久未使用的条目
+NLP_CACHE_MAX_ENTRIES = 50000
+# 影响实体提取结果的词典目录，词典变化后旧的缓存结果失效
+NLP_DICT_DIR = os.path.join('data', 'dictionaries')
+
 # 默认配置
 DEFAULT_CONFIG = {
     'spider': {
@@ -55,6 +71,7 @@ DEFAULT_CONFIG = {
         'relation': 'hanlp',   # 关系提取器
         'use_stopwords': True, # 是否使用停用词
         'top_keywords': 5,      # 每篇文章提取的关键词数量
+        'workers': 1,           # NLP处理进程数，大于1时多进程并行处理文章
         'keywords_count': 10,
         'summary_sentences': 3
     },
@@ -65,6 +82,25 @@ DEFAULT_CONFIG = {
 }
 
 
+@lru_cache(maxsize=8)
+def _read_config_file(config_file: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    读取并解析配置文件，按(路径, 修改时间, 大小)缓存解析结果
+    
+    文件未变化时重复加载不再重新打开和解析JSON；返回值为缓存对象，调用方不得修改
+    
+    Args:
+        config_file: 配置文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        size: 文件大小
+        
+    Returns:
+        解析后的配置字典
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 def load_config(config_file: str) -> Dict[str, Any]:
     """
     加载配置文件
@@ -75,27 +111,394 @@ def load_config(config_file: str) -> Dict[str, Any]:
     Returns:
         配置字典
     """
-    config = DEFAULT_CONFIG.copy()
+    # 深拷贝默认配置，合并用户配置时不会改动模块级的DEFAULT_CONFIG
+    config = copy.deepcopy(DEFAULT_CONFIG)
     
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                user_config = json.load(f)
+    try:
+        st = os.stat(config_file)
+    except FileNotFoundError:
+        logger.warning(f"配置文件不存在: {config_file}，使用默认配置")
+        return config
+    
+    try:
+        # 缓存的解析结果是共享的，合并前深拷贝一份
+        user_config = copy.deepcopy(_read_config_file(config_file, st.st_mtime_ns, st.st_size))
+            
+        # 合并用户配置
+        for section, section_config in user_config.items():
+            if section in config:
+                config[section].update(section_config)
+            else:
+                config[section] = section_config
                 
-            # 合并用户配置
-            for section, section_config in user_config.items():
-                if section in config:
-                    config[section].update(section_config)
-                else:
-                    config[section] = section_config
-                    
-            logger.info(f"已加载配置文件: {config_file}")
+        logger.info(f"已加载配置文件: {config_file}")
+    except Exception as e:
+        logger.warning(f"加载配置文件失败: {e}，使用默认配置")
+    
+    return config
+
+
+# 当前进程中的NLP处理器，由 _init_nlp_worker 初始化
+_nlp_worker: Dict[str, Any] = {}
+
+
+def _init_nlp_worker(nlp_config: Dict[str, Any]) -> None:
+    """
+    初始化当前进程的NLP处理器
+    
+    多进程处理时作为进程池的initializer，每个工作进程只创建一次提取器
+    
+    Args:
+        nlp_config: NLP配置
+    """
+    from nlp.entity import create_entity_extractor
+    from nlp.relation import create_relation_extractor
+    
+    # 创建实体提取器
+    try:
+        entity_extractor = create_entity_extractor(nlp_config['extractor'])
+    except Exception as e:
+        logger.error(f"创建实体提取器失败: {e}")
+        entity_extractor = None
+    
+    # 创建关系提取器
+    try:
+        relation_extractor = create_relation_extractor(nlp_config['relation'])
+    except Exception as e:
+        logger.error(f"创建关系提取器失败: {e}")
+        relation_extractor = None
+    
+    _nlp_worker.update(
+        entity_extractor=entity_extractor,
+        relation_extractor=relation_extractor
+    )
+
+
+def _dumps_json(obj: Any) -> str:
+    """
+    将分析结果序列化为JSON字符串，非ASCII字符原样保留
+    
+    优先使用orjson，遇到orjson不支持的数据时回退到标准库json；两者输出相同的紧凑格式
+    
+    Args:
+        obj: 待序列化的对象
+        
+    Returns:
+        JSON字符串
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _process_content(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    对单篇文章内容提取实体和关系三元组
+    
+    需先调用 _init_nlp_worker 初始化当前进程的处理器；关键词在主进程中批量提取
+    
+    Args:
+        content: 文章内容
+        
+    Returns:
+        (实体JSON, 三元组JSON)，未启用或提取失败的项为None
+    """
+    entities_json = None
+    triples_json = None
+    
+    # 提取实体
+    entity_extractor = _nlp_worker['entity_extractor']
+    if entity_extractor:
+        try:
+            entities = entity_extractor.extract_entities(content)
+            entities_json = _dumps_json(entities)
+        except Exception as e:
+            logger.error(f"提取实体失败: {e}")
+    
+    # 提取关系三元组
+    relation_extractor = _nlp_worker['relation_extractor']
+    if relation_extractor:
+        try:
+            triples = relation_extractor.extract_triples(content)
+            triples_json = _dumps_json([triple.to_dict() for triple in triples])
         except Exception as e:
-            logger.warning(f"加载配置文件失败: {e}，使用默认配置")
+            logger.error(f"提取关系三元组失败: {e}")
+    
+    return entities_json, triples_json
+
+
+def _nlp_cache_salt(nlp_config: Dict[str, Any]) -> bytes:
+    """
+    计算NLP结果缓存键的前缀
+    
+    包含缓存版本、实体和关系提取器名称以及词典文件的名称、大小和修改时间，
+    更换提取器或修改词典后不会命中旧结果
+    
+    Args:
+        nlp_config: NLP配置
+        
+    Returns:
+        缓存键前缀
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{NLP_CACHE_VERSION}|{nlp_config['extractor']}|{nlp_config['relation']}|".encode('utf-8'))
+    
+    try:
+        names = sorted(os.listdir(NLP_DICT_DIR))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        path = os.path.join(NLP_DICT_DIR, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            h.update(f"{name}|{stat.st_size}|{stat.st_mtime_ns}|".encode('utf-8'))
+    
+    return h.digest()
+
+
+def _content_key(content: str, salt: bytes) -> str:
+    """
+    计算文章内容的缓存键
+    
+    Args:
+        content: 文章内容
+        salt: 由 _nlp_cache_salt 计算的缓存键前缀
+        
+    Returns:
+        十六进制摘要字符串
+    """
+    h = hashlib.blake2b(salt, digest_size=16)
+    h.update(content.encode('utf-8'))
+    return h.hexdigest()
+
+
+def _load_nlp_cache(cache_file: Optional[str]) -> Dict[str, List[Optional[str]]]:
+    """
+    加载实体和关系提取结果缓存
+    
+    Args:
+        cache_file: 缓存文件路径，为None时不使用缓存
+        
+    Returns:
+        内容摘要到 [实体JSON, 三元组JSON] 的映射
+    """
+    if not cache_file:
+        return {}
+    
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        logger.info(f"已加载 {len(cache)} 条NLP结果缓存")
+        return cache
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"加载NLP结果缓存失败: {e}")
+        return {}
+
+
+def _save_nlp_cache(cache: Dict[str, List[Optional[str]]], cache_file: str,
+                    used_keys: Optional[List[str]] = None) -> None:
+    """
+    保存实体和关系提取结果缓存
+    
+    本次运行用到的条目移到末尾，超过 NLP_CACHE_MAX_ENTRIES 时从头部淘汰最久未使用的条目；
+    先写入临时文件再替换，中途失败不会损坏已有缓存
+    
+    Args:
+        cache: 内容摘要到 [实体JSON, 三元组JSON] 的映射
+        cache_file: 缓存文件路径
+        used_keys: 本次运行用到的内容摘要
+    """
+    if used_keys:
+        used = {key: cache[key] for key in used_keys if key in cache}
+        cache = {key: value for key, value in cache.items() if key not in used}
+        cache.update(used)
+    if len(cache) > NLP_CACHE_MAX_ENTRIES:
+        cache = dict(list(cache.items())[-NLP_CACHE_MAX_ENTRIES:])
+    
+    tmp_file = cache_file + '.tmp'
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.warning(f"保存NLP结果缓存失败: {e}")
+        # 删除写了一半的临时文件，已有缓存文件保持不变
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def analyze_contents(contents: List[Any], nlp_config: Dict[str, Any],
+                     cache_file: Optional[str] = None,
+                     precomputed: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None
+                     ) -> Dict[str, List[Optional[str]]]:
+    """
+    批量分析文章内容，提取关键词、实体和关系三元组
+    
+    实体和关系提取结果按内容摘要缓存，内容相同的文章只提取一次；
+    指定cache_file时缓存跨运行保存，增量模式下未变化的文章不再重复提取
+    
+    Args:
+        contents: 文章内容列表，非字符串或空内容不做分析
+        nlp_config: NLP配置
+        cache_file: 实体和关系提取结果缓存文件路径，为None时只在本次运行内去重
+        precomputed: 已提取好的结果，内容摘要(_content_key) -> (实体JSON, 三元组JSON)，
+            如爬取过程中提前提取的结果，这些内容不再重复提取
+        
+    Returns:
+        按列组织的分析结果 {'keywords': [...], 'entities': [...], 'triples': [...]}，
+        每列与contents等长，未分析或提取失败的位置为None
+    """
+    columns: Dict[str, List[Optional[str]]] = {
+        'keywords': [None] * len(contents),
+        'entities': [None] * len(contents),
+        'triples': [None] * len(contents)
+    }
+    
+    # 只分析有内容的文章，记录其在原列表中的位置
+    indices = [i for i, content in enumerate(contents) if isinstance(content, str) and content]
+    texts = [contents[i] for i in indices]
+    if not texts:
+        return columns
+    
+    from nlp.segmentation import create_segmenter
+    from nlp.tfidf import TFIDFExtractor
+    
+    # 创建分词器
+    segmenter = create_segmenter(nlp_config['segmenter'])
+    
+    # 创建TF-IDF提取器并添加语料库
+    tfidf_extractor = TFIDFExtractor(segmenter)
+    tfidf_extractor.add_corpus(texts)
+    
+    # 批量提取关键词，复用构建语料库时的分词结果
+    keywords_list = tfidf_extractor.extract_corpus_keywords(nlp_config['top_keywords'])
+    for i, keywords in zip(indices, keywords_list):
+        columns['keywords'][i] = ','.join([keyword for keyword, _ in keywords])
+    
+    # 只对缓存中没有的内容提取实体和关系，重复内容只处理一次
+    cache = _load_nlp_cache(cache_file)
+    precomputed = precomputed or {}
+    salt = _nlp_cache_salt(nlp_config)
+    keys = [_content_key(text, salt) for text in texts]
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in cache and key not in precomputed and key not in pending:
+            pending[key] = text
+    pending_texts = list(pending.values())
+    if len(pending_texts) < len(texts):
+        logger.info(f"{len(texts) - len(pending_texts)} 篇文章已有提取结果或内容重复，跳过实体和关系提取")
+    
+    workers = nlp_config.get('workers', 1)
+    if not pending_texts:
+        results = []
+    elif workers > 1:
+        # 多进程并行处理文章，使用spawn方式启动，避免fork已加载JVM的进程
+        logger.info(f"使用 {workers} 个进程处理 {len(pending_texts)} 篇文章")
+        chunksize = max(1, len(pending_texts) // (8 * workers))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_nlp_worker,
+            initargs=(nlp_config,)
+        ) as executor:
+            results = list(executor.map(_process_content, pending_texts, chunksize=chunksize))
     else:
-        logger.warning(f"配置文件不存在: {config_file}，使用默认配置")
+        _init_nlp_worker(nlp_config)
+        results = []
+        for n, text in enumerate(pending_texts):
+            logger.info(f"处理文章 {n+1}/{len(pending_texts)}")
+            results.append(_process_content(text))
     
-    return config
+    # 本次结果只在内存中用于去重；两项都提取成功的才写入持久缓存，失败的下次重试
+    computed = dict(precomputed)
+    computed.update(zip(pending, results))
+    for key, (entities_json, triples_json) in computed.items():
+        if entities_json is not None and triples_json is not None:
+            cache[key] = [entities_json, triples_json]
+    
+    for i, key in zip(indices, keys):
+        entities_json, triples_json = computed[key] if key in computed else cache[key]
+        columns['entities'][i] = entities_json
+        columns['triples'][i] = triples_json
+    
+    # 没有新结果时缓存内容不变，无需重写文件
+    if cache_file and computed:
+        _save_nlp_cache(cache, cache_file, keys)
+    
+    return columns
+
+
+class _CrawlNLPPrefetcher:
+    """
+    在爬取过程中提前提取文章的实体和关系
+    
+    作为爬虫的 on_article 回调，把新文章提交到NLP进程池，使网络I/O与实体关系提取重叠进行；
+    关键词依赖完整语料库的IDF，仍在爬取结束后统一提取
+    """
+    
+    def __init__(self, nlp_config: Dict[str, Any], cache_file: Optional[str] = None) -> None:
+        """
+        初始化并启动NLP进程池
+        
+        Args:
+            nlp_config: NLP配置
+            cache_file: 实体和关系提取结果缓存文件路径，已缓存的内容不再提交
+        """
+        self.nlp_config = nlp_config
+        self.salt = _nlp_cache_salt(nlp_config)
+        self.cached_keys = set(_load_nlp_cache(cache_file))
+        self.futures: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.executor = ProcessPoolExecutor(
+            max_workers=nlp_config['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_nlp_worker,
+            initargs=(nlp_config,)
+        )
+    
+    def __call__(self, article: Dict[str, Any]) -> None:
+        """
+        提交一篇文章的实体和关系提取任务
+        
+        Args:
+            article: 文章信息字典
+        """
+        content = article.get('content')
+        if not isinstance(content, str) or not content:
+            return
+        
+        key = _content_key(content, self.salt)
+        with self.lock:
+            if key in self.cached_keys or key in self.futures:
+                return
+            self.futures[key] = self.executor.submit(_process_content, content)
+    
+    def collect(self) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        等待已提交的任务完成并关闭进程池
+        
+        Returns:
+            内容摘要 -> (实体JSON, 三元组JSON)，执行失败的任务不在结果中
+        """
+        results = {}
+        try:
+            for key, future in self.futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"提前提取实体和关系失败: {e}")
+        finally:
+            self.executor.shutdown()
+        
+        logger.info(f"爬取过程中已完成 {len(results)} 篇文章的实体和关系提取")
+        return results
 
 
 def save_articles_to_csv(articles: List[Dict[str, Any]], output_file: str, encoding: str = 'utf-8-sig') -> None:
@@ -112,8 +515,8 @@ def save_articles_to_csv(articles: List[Dict[str, Any]], output_file: str, encod
         return
     
     try:
-        df = pd.DataFrame(articles)
-        df.to_csv(output_file, index=False, encoding=encoding)
+        # 逐行写入，无需构建DataFrame
+        write_articles_csv(articles, output_file, encoding)
         logger.info(f"已将 {len(articles)} 篇文章保存至: {output_file}")
     except Exception as e:
         logger.error(f"保存CSV文件失败: {e}")
@@ -169,6 +572,11 @@ def main():
     
     # 爬取文章
     articles = []
+    # 增量模式下直接以DataFrame按列处理已有数据，不逐行转换为字典
+    articles_df = None
+    # 实体和关系提取结果缓存文件，以及爬取过程中提前提取的结果
+    nlp_cache_file = os.path.join(output_dir, 'nlp_cache.json')
+    precomputed = {}
     
     if not args.incremental:
         logger.info("开始爬取文章")
@@ -213,89 +621,76 @@ def main():
             proxy_pool=proxy_pool
         )
         
+        # 多进程NLP时在爬取的同时提前提取实体和关系
+        prefetcher = None
+        if config['nlp'].get('workers', 1) > 1:
+            prefetcher = _CrawlNLPPrefetcher(config['nlp'], nlp_cache_file)
+        
         # 爬取文章
         try:
-            articles = spider.crawl()
+            articles = spider.crawl(on_article=prefetcher)
             logger.info(f"爬取完成，共获取 {len(articles)} 篇文章，耗时 {time.time() - start_time:.2f} 秒")
         except Exception as e:
             logger.error(f"爬取文章失败: {e}")
             return
+        finally:
+            if prefetcher is not None:
+                precomputed = prefetcher.collect()
     else:
         # 从CSV加载已有数据
-        if os.path.exists(output_file):
-            try:
-                df = pd.read_csv(output_file)
-                articles = df.to_dict('records')
-                logger.info(f"已从 {output_file} 加载 {len(articles)} 篇文章")
-            except Exception as e:
-                logger.error(f"加载CSV文件失败: {e}")
-                return
-        else:
+        try:
+            import pandas as pd
+            
+            articles_df = pd.read_csv(output_file)
+            logger.info(f"已从 {output_file} 加载 {len(articles_df)} 篇文章")
+        except FileNotFoundError:
             logger.error(f"文件不存在: {output_file}")
             return
+        except Exception as e:
+            logger.error(f"加载CSV文件失败: {e}")
+            return
     
     # NLP处理
-    if articles:
+    if articles_df is not None:
+        if 'content' in articles_df.columns:
+            contents = articles_df['content'].tolist()
+        else:
+            contents = [None] * len(articles_df)
+    else:
+        contents = [article.get('content') for article in articles]
+    
+    if contents:
         logger.info("开始NLP处理")
         start_time = time.time()
         
-        # 创建分词器
-        segmenter = create_segmenter(config['nlp']['segmenter'])
-        
-        # 创建TF-IDF提取器
-        tfidf_extractor = TFIDFExtractor(segmenter)
+        columns = analyze_contents(contents, config['nlp'],
+                                   cache_file=nlp_cache_file, precomputed=precomputed)
         
-        # 添加语料库
-        texts = [article['content'] for article in articles if 'content' in article]
-        tfidf_extractor.add_corpus(texts)
-        
-        # 创建实体提取器
-        try:
-            entity_extractor = create_entity_extractor(config['nlp']['extractor'])
-        except Exception as e:
-            logger.error(f"创建实体提取器失败: {e}")
-            entity_extractor = None
-        
-        # 创建关系提取器
-        try:
-            relation_extractor = create_relation_extractor(config['nlp']['relation'])
-        except Exception as e:
-            logger.error(f"创建关系提取器失败: {e}")
-            relation_extractor = None
-        
-        # 处理每篇文章
-        for i, article in enumerate(articles):
-            logger.info(f"处理文章 {i+1}/{len(articles)}: {article.get('title', '未知标题')}")
-            
-            # 提取文章内容
-            content = article.get('content', '')
-            if not content:
-                continue
-            
-            # 提取关键词
-            keywords = tfidf_extractor.extract_keywords(content, config['nlp']['top_keywords'])
-            article['keywords'] = ','.join([keyword for keyword, _ in keywords])
-            
-            # 提取实体
-            if entity_extractor:
-                try:
-                    entities = entity_extractor.extract_entities(content)
-                    article['entities'] = json.dumps(entities, ensure_ascii=False)
-                except Exception as e:
-                    logger.error(f"提取实体失败: {e}")
-            
-            # 提取关系三元组
-            if relation_extractor:
-                try:
-                    triples = relation_extractor.extract_triples(content)
-                    article['triples'] = json.dumps([triple.to_dict() for triple in triples], ensure_ascii=False)
-                except Exception as e:
-                    logger.error(f"提取关系三元组失败: {e}")
+        # 写回分析结果，未分析的文章保留原有值
+        for column, values in columns.items():
+            if articles_df is not None:
+                if column in articles_df.columns:
+                    existing = articles_df[column].astype(object).tolist()
+                else:
+                    existing = [None] * len(articles_df)
+                articles_df[column] = [value if value is not None else old
+                                       for value, old in zip(values, existing)]
+            else:
+                for article, value in zip(articles, values):
+                    if value is not None:
+                        article[column] = value
         
         logger.info(f"NLP处理完成，耗时 {time.time() - start_time:.2f} 秒")
     
     # 保存结果
-    save_articles_to_csv(articles, output_file, config['output']['encoding'])
+    if articles_df is not None:
+        try:
+            articles_df.to_csv(output_file, index=False, encoding=config['output']['encoding'])
+            logger.info(f"已将 {len(articles_df)} 篇文章保存至: {output_file}")
+        except Exception as e:
+            logger.error(f"保存CSV文件失败: {e}")
+    else:
+        save_articles_to_csv(articles, output_file, config['output']['encoding'])
     
     # 启动可视化Web应用
     logger.info("NLP分析处理已完成")
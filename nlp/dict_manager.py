@@ -5,7 +5,6 @@
 """
 
 import os
-import json
 import logging
 from typing import Dict, List, Set, Optional, Tuple, Any
 import re
@@ -13,6 +12,31 @@ import re
 # 设置日志
 logger = logging.getLogger('dict_manager')
 
+# 用户词典行中的属性项，如 pos=nl、freq=1000、category=industry（仅匹配独立的空白分隔项）
+_ATTR_RE = re.compile(r'(?<!\S)(pos|freq|category)=(\S*)')
+
+# 词典类别
+_CATEGORIES = (
+    'custom',        # 自定义词
+    'person',        # 人名
+    'place',         # 地名
+    'organization',  # 组织机构名
+    'time',          # 时间词
+    'industry',      # 行业术语
+    'stop'           # 停用词
+)
+_VALID_CATS = frozenset(_CATEGORIES)
+
+# 未记录词性和词频的词语使用的默认属性（只读）
+_DEFAULT_ATTRS = {'pos': 'n', 'freq': 100}
+
+# 各分词器的自定义词典文件名，HanLP和LTP暂时使用与jieba相同的格式
+_SEGMENTER_DICT_FILES = {
+    'jieba': 'jieba_dict.txt',
+    'hanlp': 'hanlp_dict.txt',
+    'ltp': 'ltp_dict.txt'
+}
+
 class DictManager:
     """
     词典管理器
@@ -45,20 +69,21 @@ class DictManager:
         self.user_dict_file = user_dict_file or 'user_dict.txt'
         self.user_dict_path = os.path.join(self.dict_dir, self.user_dict_file)
         
-        # 词典类别
-        self.dict_categories = {
-            'custom': set(),   # 自定义词
-            'person': set(),   # 人名
-            'place': set(),    # 地名
-            'organization': set(),  # 组织机构名
-            'time': set(),     # 时间词
-            'industry': set(), # 行业术语
-            'stop': set()      # 停用词
-        }
+        # 各类别的词语集合
+        self.dict_categories: Dict[str, Set[str]] = {category: set() for category in _CATEGORIES}
         
         # 词频和词性映射
         self.word_attrs = {}  # {'word': {'freq': 100, 'pos': 'n'}}
         
+        # 词语到所属类别的索引，每个词语只属于一个类别
+        self.word_category: Dict[str, str] = {}
+        
+        # 各类别排好序的词语列表缓存，类别内容变化时失效
+        self._sorted_words: Dict[str, List[str]] = {}
+        
+        # jieba格式词典内容缓存，词语或其属性变化时失效
+        self._jieba_content: Optional[str] = None
+        
         # 加载用户词典
         self.load_dict()
     
@@ -66,75 +91,89 @@ class DictManager:
         """
         加载词典
         """
-        # 加载用户词典
-        if os.path.exists(self.user_dict_path):
-            try:
-                with open(self.user_dict_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or line.startswith('#'):
-                            continue
-                        
-                        parts = line.split()
-                        word = parts[0]
-                        
-                        # 解析词性和频率
-                        pos = 'n'  # 默认词性为名词
-                        freq = 100  # 默认词频
-                        category = 'custom'  # 默认分类
-                        
-                        if len(parts) > 1:
-                            # 解析词性
-                            for p in parts[1:]:
-                                if p.startswith('pos='):
-                                    pos = p[4:]
-                                elif p.startswith('freq='):
-                                    try:
-                                        freq = int(p[5:])
-                                    except ValueError:
-                                        pass
-                                elif p.startswith('category='):
-                                    category = p[9:]
-                        
-                        # 添加到词典
-                        if category in self.dict_categories:
-                            self.dict_categories[category].add(word)
-                        else:
-                            self.dict_categories['custom'].add(word)
-                        
-                        # 记录词性和词频
-                        self.word_attrs[word] = {'pos': pos, 'freq': freq}
+        # 加载用户词典，不存在时创建新词典
+        try:
+            # 先解析到临时容器，最后一次性合并到词典
+            word_category = {}
+            word_attrs = {}
+            
+            # 一次读入整个文件按字节切分行，空行和注释行无需解码
+            with open(self.user_dict_path, 'rb') as f:
+                data = f.read()
+            
+            for raw in data.splitlines():
+                raw = raw.strip()
+                if not raw or raw.startswith(b'#'):
+                    continue
                 
-                logger.info(f"已加载用户词典: {self.user_dict_path}")
-            except Exception as e:
-                logger.error(f"加载用户词典失败: {e}")
-        else:
+                line = raw.decode('utf-8').strip()
+                if not line:
+                    continue
+                
+                parts = line.split(None, 1)
+                word = parts[0]
+                
+                # 解析词性、词频和分类，同一属性出现多次时以最后一次为准
+                attrs = dict(_ATTR_RE.findall(parts[1])) if len(parts) > 1 else {}
+                pos = attrs.get('pos', 'n')  # 默认词性为名词
+                freq = 100  # 默认词频
+                if 'freq' in attrs:
+                    try:
+                        freq = int(attrs['freq'])
+                    except ValueError:
+                        pass
+                category = attrs.get('category', 'custom')  # 默认分类
+                
+                # 添加到词典
+                if category not in _VALID_CATS:
+                    category = 'custom'
+                word_category[word] = category
+                
+                # 记录词性和词频
+                word_attrs[word] = {'pos': pos, 'freq': freq}
+            
+            # 文件中重复出现的词语以最后一次的类别为准
+            for word, category in word_category.items():
+                self._set_word_category(word, category)
+            self.word_attrs.update(word_attrs)
+            self._jieba_content = None
+            
+            logger.info(f"已加载用户词典: {self.user_dict_path}")
+        except FileNotFoundError:
             logger.warning(f"用户词典不存在: {self.user_dict_path}，将创建新词典")
             # 创建空的用户词典文件
             with open(self.user_dict_path, 'w', encoding='utf-8') as f:
                 f.write("# 自定义词典\n")
                 f.write("# 格式: 词语 [pos=词性] [freq=词频] [category=分类]\n")
                 f.write("# 示例: 自然语言处理 pos=nl freq=1000 category=industry\n")
+        except Exception as e:
+            logger.error(f"加载用户词典失败: {e}")
     
     def save_dict(self) -> None:
         """
         保存词典
         """
         try:
+            lines = [
+                "# 自定义词典\n",
+                "# 格式: 词语 [pos=词性] [freq=词频] [category=分类]\n",
+                "# 示例: 自然语言处理 pos=nl freq=1000 category=industry\n\n"
+            ]
+            
+            # 按类别生成词典内容
+            word_attrs_get = self.word_attrs.get
+            for category, words in self.dict_categories.items():
+                if words:
+                    lines.append(f"# {category} 类别\n")
+                    for word in self._get_sorted_words(category):
+                        # 获取词性和词频
+                        attrs = word_attrs_get(word, _DEFAULT_ATTRS)
+                        lines.append(f"{word} pos={attrs['pos']} freq={attrs['freq']} category={category}\n")
+                    lines.append("\n")
+            
+            # 拼接后一次性写入
             with open(self.user_dict_path, 'w', encoding='utf-8') as f:
-                f.write("# 自定义词典\n")
-                f.write("# 格式: 词语 [pos=词性] [freq=词频] [category=分类]\n")
-                f.write("# 示例: 自然语言处理 pos=nl freq=1000 category=industry\n\n")
-                
-                # 按类别写入词典
-                for category, words in self.dict_categories.items():
-                    if words:
-                        f.write(f"# {category} 类别\n")
-                        for word in sorted(words):
-                            # 获取词性和词频
-                            attrs = self.word_attrs.get(word, {'pos': 'n', 'freq': 100})
-                            f.write(f"{word} pos={attrs['pos']} freq={attrs['freq']} category={category}\n")
-                        f.write("\n")
+                f.write(''.join(lines))
                 
                 logger.info(f"已保存用户词典: {self.user_dict_path}")
         except Exception as e:
@@ -160,24 +199,66 @@ class DictManager:
         word = word.strip()
         
         # 检查类别是否有效
-        if category not in self.dict_categories:
+        if category not in _VALID_CATS:
             logger.warning(f"无效的词语类别: {category}，使用默认类别'custom'")
             category = 'custom'
         
-        # 删除可能已存在于其他类别的词语
-        for cat in self.dict_categories:
-            if word in self.dict_categories[cat]:
-                self.dict_categories[cat].remove(word)
-        
-        # 添加到指定类别
-        self.dict_categories[category].add(word)
+        # 添加到指定类别，同时从原类别中移除
+        self._set_word_category(word, category)
         
         # 记录词性和词频
         self.word_attrs[word] = {'pos': pos, 'freq': freq}
+        self._jieba_content = None
         
         logger.info(f"已添加词语: {word} (pos={pos}, freq={freq}, category={category})")
         return True
     
+    def _set_word_category(self, word: str, category: str) -> None:
+        """
+        设置词语的类别，并从原类别中移除
+        
+        Args:
+            word: 词语
+            category: 有效的词语类别
+        """
+        old_category = self.word_category.get(word)
+        if old_category == category:
+            return
+        
+        if old_category is not None:
+            self.dict_categories[old_category].discard(word)
+            self._invalidate_category(old_category)
+        self.dict_categories[category].add(word)
+        self._invalidate_category(category)
+        self.word_category[word] = category
+    
+    def _invalidate_category(self, category: str) -> None:
+        """
+        类别内容变化后清除该类别相关的缓存
+        
+        Args:
+            category: 内容发生变化的类别
+        """
+        self._sorted_words.pop(category, None)
+    
+    def _get_sorted_words(self, category: str) -> List[str]:
+        """
+        获取指定类别排好序的词语列表
+        
+        排序结果缓存到类别内容变化为止，多次导出只排序一次；返回值为缓存对象，调用方不得修改
+        
+        Args:
+            category: 有效的词语类别
+            
+        Returns:
+            排好序的词语列表
+        """
+        words = self._sorted_words.get(category)
+        if words is None:
+            words = sorted(self.dict_categories[category])
+            self._sorted_words[category] = words
+        return words
+    
     def add_words(self, words: List[Dict[str, Any]]) -> int:
         """
         批量添加词语到词典
@@ -216,17 +297,18 @@ class DictManager:
             return False
         
         word = word.strip()
-        removed = False
         
-        # 从所有类别中删除词语
-        for category in self.dict_categories:
-            if word in self.dict_categories[category]:
-                self.dict_categories[category].remove(word)
-                removed = True
+        # 通过索引找到词语所属类别并删除
+        category = self.word_category.pop(word, None)
+        removed = category is not None
+        if removed:
+            self.dict_categories[category].discard(word)
+            self._invalidate_category(category)
         
         # 删除词性和词频记录
         if word in self.word_attrs:
             del self.word_attrs[word]
+        self._jieba_content = None
         
         if removed:
             logger.info(f"已删除词语: {word}")
@@ -245,11 +327,11 @@ class DictManager:
         Returns:
             词语列表
         """
-        if category not in self.dict_categories:
+        if category not in _VALID_CATS:
             logger.warning(f"无效的词语类别: {category}")
             return []
         
-        return sorted(list(self.dict_categories[category]))
+        return list(self._get_sorted_words(category))
     
     def get_all_words(self) -> Dict[str, List[str]]:
         """
@@ -258,7 +340,7 @@ class DictManager:
         Returns:
             按类别分类的词语字典
         """
-        return {category: sorted(list(words)) for category, words in self.dict_categories.items()}
+        return {category: list(self._get_sorted_words(category)) for category in self.dict_categories}
     
     def export_jieba_dict(self, output_file: str = None) -> str:
         """
@@ -273,16 +355,9 @@ class DictManager:
         output_file = output_file or os.path.join(self.dict_dir, 'jieba_dict.txt')
         
         try:
+            # 一次性写入全部词典内容
             with open(output_file, 'w', encoding='utf-8') as f:
-                for category, words in self.dict_categories.items():
-                    for word in sorted(words):
-                        # 跳过停用词
-                        if category == 'stop':
-                            continue
-                        
-                        # 获取词性和词频
-                        attrs = self.word_attrs.get(word, {'pos': 'n', 'freq': 100})
-                        f.write(f"{word} {attrs['freq']} {attrs['pos']}\n")
+                f.write(self._build_jieba_content())
                 
             logger.info(f"已导出jieba词典: {output_file}")
             return output_file
@@ -290,6 +365,31 @@ class DictManager:
             logger.error(f"导出jieba词典失败: {e}")
             return ""
     
+    def _build_jieba_content(self) -> str:
+        """
+        生成jieba格式的词典内容（不含停用词）
+        
+        内容缓存到词典变化为止，多次导出（如为多个分词器构建词典）只生成一次
+        
+        Returns:
+            词典文件内容
+        """
+        if self._jieba_content is None:
+            word_attrs_get = self.word_attrs.get
+            lines = []
+            for category in self.dict_categories:
+                if category == 'stop':
+                    continue
+                
+                for word in self._get_sorted_words(category):
+                    # 获取词性和词频
+                    attrs = word_attrs_get(word, _DEFAULT_ATTRS)
+                    lines.append(f"{word} {attrs['freq']} {attrs['pos']}\n")
+            
+            self._jieba_content = ''.join(lines)
+        
+        return self._jieba_content
+    
     def export_stopwords(self, output_file: str = None) -> str:
         """
         导出停用词
@@ -305,8 +405,7 @@ class DictManager:
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write("# 停用词表\n")
-                for word in sorted(self.dict_categories['stop']):
-                    f.write(f"{word}\n")
+                f.write(''.join(f"{word}\n" for word in self._get_sorted_words('stop')))
                 
             logger.info(f"已导出停用词: {output_file}")
             return output_file
@@ -325,11 +424,7 @@ class DictManager:
         Returns:
             导入的词语数量
         """
-        if not os.path.exists(file_path):
-            logger.error(f"文件不存在: {file_path}")
-            return 0
-        
-        if category not in self.dict_categories:
+        if category not in _VALID_CATS:
             logger.warning(f"无效的词语类别: {category}，使用默认类别'custom'")
             category = 'custom'
         
@@ -360,6 +455,9 @@ class DictManager:
             
             logger.info(f"从文件 {file_path} 导入了 {count} 个词语")
             return count
+        except FileNotFoundError:
+            logger.error(f"文件不存在: {file_path}")
+            return 0
         except Exception as e:
             logger.error(f"从文件导入词语失败: {e}")
             return 0
@@ -376,17 +474,13 @@ class DictManager:
         """
         segmenter_type = segmenter_type.lower()
         
-        if segmenter_type == 'jieba':
-            return self.export_jieba_dict()
-        elif segmenter_type == 'hanlp':
-            # HanLP使用相同格式，但可能需要不同文件名
-            return self.export_jieba_dict(os.path.join(self.dict_dir, 'hanlp_dict.txt'))
-        elif segmenter_type == 'ltp':
-            # LTP可能使用不同格式，此处简化处理
-            return self.export_jieba_dict(os.path.join(self.dict_dir, 'ltp_dict.txt'))
-        else:
+        dict_file = _SEGMENTER_DICT_FILES.get(segmenter_type)
+        if dict_file is None:
             logger.warning(f"不支持的分词器类型: {segmenter_type}")
             return ""
+        
+        # 各分词器共用同一份缓存的词典内容，只是文件名不同
+        return self.export_jieba_dict(os.path.join(self.dict_dir, dict_file))
 
 
 # 测试代码
@@ -4,7 +4,11 @@
 使用HanLP或LTP提取文章中的实体要素
 """
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple, Set
 import jieba
 
@@ -26,43 +30,185 @@ except ImportError:
 
 logger = logging.getLogger('entity')
 
+# HanLP词性到实体类别的映射：人名、地名、组织机构名
+_HANLP_NATURE_CATEGORIES = {
+    'nr': 'person', 'nrj': 'person', 'nrf': 'person',
+    'ns': 'place', 'nsf': 'place',
+    'nt': 'organization', 'ntc': 'organization', 'ntcf': 'organization',
+    'nto': 'organization', 'ntu': 'organization', 'nts': 'organization'
+}
+
+# LTP命名实体类型到实体类别的映射：Nh人名、Ns地名、Ni组织机构名
+_LTP_NE_CATEGORIES = {
+    'Nh': 'person',
+    'Ns': 'place',
+    'Ni': 'organization'
+}
+
+def _load_word_set(path: str, desc: str) -> Set[str]:
+    """
+    加载每行一个词语的词典文件
+    
+    一次读入并解码整个文件，再按行切分
+    
+    Args:
+        path: 词典文件路径
+        desc: 词典描述，用于日志
+        
+    Returns:
+        词语集合，加载失败时返回空集合
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return {word for word in map(str.strip, data.decode('utf-8').splitlines()) if word}
+    except (OSError, UnicodeDecodeError):
+        logger.warning(f"无法加载{desc}词典，将使用空词典")
+        return set()
+
+
 class EntityExtractor:
     """
     实体提取器基类
     """
     
+    # 实体提取结果缓存的最大条目数
+    CACHE_SIZE = 1024
+    
+    # 提取器名称，用于日志
+    NAME = '实体提取器'
+    
+    # 结果中的实体类别
+    CATEGORIES: Tuple[str, ...] = ('person', 'place', 'organization')
+    
     def __init__(self) -> None:
         """
         初始化实体提取器
         """
-        pass
+        # 提取结果缓存：文本摘要 -> 实体字典，按最近使用顺序淘汰
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """
+        计算文本的缓存键
+        
+        Args:
+            text: 待处理文本
+            
+        Returns:
+            文本的blake2b摘要
+        """
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _get_cached(self, key: bytes) -> Optional[Dict[str, List[str]]]:
+        """
+        读取缓存的提取结果
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            实体字典的副本，未命中时返回None
+        """
+        with self._cache_lock:
+            entities = self._cache.get(key)
+            if entities is None:
+                return None
+            self._cache.move_to_end(key)
+        # 返回副本，调用方修改结果不会影响缓存
+        return {category: list(words) for category, words in entities.items()}
+    
+    def _put_cached(self, key: bytes, entities: Dict[str, List[str]]) -> None:
+        """
+        缓存提取结果，超出容量时淘汰最久未使用的条目
+        
+        Args:
+            key: 缓存键
+            entities: 实体字典
+        """
+        entities = {category: list(words) for category, words in entities.items()}
+        with self._cache_lock:
+            self._cache[key] = entities
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
         提取文本中的实体
         
+        相同文本直接返回缓存结果；未命中时调用子类的 _extract_uncached 提取并缓存，
+        提取失败的结果不缓存
+        
         Args:
             text: 待处理文本
             
+        Returns:
+            按实体类型分类的实体列表字典
+        """
+        if not text:
+            return self._empty_entities()
+        
+        key = self._cache_key(text)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            entities = self._extract_uncached(text)
+        except Exception as e:
+            logger.error(f"使用{self.NAME}提取实体失败: {e}")
+            return self._empty_entities()
+        
+        self._put_cached(key, entities)
+        return entities
+    
+    def _extract_uncached(self, text: str) -> Dict[str, List[str]]:
+        """
+        实际提取文本中的实体，由子类实现
+        
+        Args:
+            text: 待处理文本（非空）
+            
         Returns:
             按实体类型分类的实体列表字典
         """
         raise NotImplementedError("子类必须实现此方法")
     
-    def batch_extract_entities(self, text_list: List[str]) -> List[Dict[str, List[str]]]:
+    def _empty_entities(self) -> Dict[str, List[str]]:
+        """
+        创建各类别均为空的实体字典
+        
+        Returns:
+            实体字典
+        """
+        return {category: [] for category in self.CATEGORIES}
+    
+    def batch_extract_entities(self, text_list: List[str], max_workers: int = 1) -> List[Dict[str, List[str]]]:
         """
         批量提取多个文本中的实体
         
         Args:
             text_list: 文本列表
+            max_workers: 并行线程数，大于1时多线程处理（HanLP调用Java期间会释放GIL）
             
         Returns:
-            每个文本的实体字典列表
+            每个文本的实体字典列表，顺序与text_list一致
         """
-        results = []
-        for text in text_list:
-            entities = self.extract_entities(text)
-            results.append(entities)
+        if max_workers <= 1 or len(text_list) <= 1:
+            return [self.extract_entities(text) for text in text_list]
+        
+        # 按文本长度从长到短提交，避免长文本最后才开始处理而拖慢整批
+        order = sorted(range(len(text_list)), key=lambda i: len(text_list[i] or ''), reverse=True)
+        results: List[Optional[Dict[str, List[str]]]] = [None] * len(text_list)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(i, executor.submit(self.extract_entities, text_list[i])) for i in order]
+            for i, future in futures:
+                results[i] = future.result()
+        
         return results
 
 
@@ -71,6 +217,8 @@ class HanLPEntityExtractor(EntityExtractor):
     基于HanLP的实体提取器
     """
     
+    NAME = 'HanLP'
+    
     def __init__(self, user_dict: Optional[str] = None) -> None:
         """
         初始化HanLP实体提取器
@@ -94,7 +242,7 @@ class HanLPEntityExtractor(EntityExtractor):
             except Exception as e:
                 logger.warning(f"加载用户词典失败: {e}")
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def _extract_uncached(self, text: str) -> Dict[str, List[str]]:
         """
         使用HanLP提取文本中的实体
         
@@ -104,42 +252,26 @@ class HanLPEntityExtractor(EntityExtractor):
         Returns:
             按实体类型分类的实体列表字典
         """
-        if not text:
-            return {}
+        entities = self._empty_entities()
         
-        # 初始化结果字典
-        entities = {
-            'person': [],     # 人名
-            'place': [],      # 地名
-            'organization': [] # 组织机构名
-        }
+        # 已收录的实体，用于按首次出现顺序去重
+        seen = {category: set() for category in entities}
         
-        try:
-            # 使用HanLP命名实体识别
-            term_list = HanLP.segment(text)
-            
-            # 提取实体
-            for term in term_list:
-                nature = str(term.nature)
-                word = term.word
-                
-                # 人名
-                if nature == 'nr' or nature == 'nrj' or nature == 'nrf':
-                    if word not in entities['person']:
-                        entities['person'].append(word)
-                # 地名
-                elif nature == 'ns' or nature == 'nsf':
-                    if word not in entities['place']:
-                        entities['place'].append(word)
-                # 组织机构名
-                elif nature == 'nt' or nature == 'ntc' or nature == 'ntcf' or nature == 'nto' or nature == 'ntu' or nature == 'nts':
-                    if word not in entities['organization']:
-                        entities['organization'].append(word)
+        # 使用HanLP命名实体识别
+        term_list = HanLP.segment(text)
+        
+        # 提取实体，按词性确定实体类别
+        for term in term_list:
+            category = _HANLP_NATURE_CATEGORIES.get(str(term.nature))
+            if category is None:
+                continue
             
-            return entities
-        except Exception as e:
-            logger.error(f"使用HanLP提取实体失败: {e}")
-            return entities
+            word = term.word
+            if word not in seen[category]:
+                seen[category].add(word)
+                entities[category].append(word)
+        
+        return entities
 
 
 class LTPEntityExtractor(EntityExtractor):
@@ -147,6 +279,8 @@ class LTPEntityExtractor(EntityExtractor):
     基于LTP的实体提取器
     """
     
+    NAME = 'LTP'
+    
     def __init__(self, segmentor_model: str, postagger_model: str, ner_model: str) -> None:
         """
         初始化LTP实体提取器
@@ -199,7 +333,7 @@ class LTPEntityExtractor(EntityExtractor):
         if hasattr(self, 'recognizer'):
             self.recognizer.release()
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def _extract_uncached(self, text: str) -> Dict[str, List[str]]:
         """
         使用LTP提取文本中的实体
         
@@ -209,81 +343,43 @@ class LTPEntityExtractor(EntityExtractor):
         Returns:
             按实体类型分类的实体列表字典
         """
-        if not text:
-            return {}
-        
-        # 初始化结果字典
-        entities = {
-            'person': [],     # 人名
-            'place': [],      # 地名
-            'organization': [] # 组织机构名
-        }
-        
-        try:
-            # LTP分词
-            words = self.segmentor.segment(text)
-            words_list = list(words)
+        entities = self._empty_entities()
+        
+        # LTP分词、词性标注和命名实体识别，中间结果直接以LTP返回的向量传递
+        words = self.segmentor.segment(text)
+        postags = self.postagger.postag(words)
+        netags = self.recognizer.recognize(words, postags)
+        
+        # 只对后续需要切片和遍历的结果各转换一次
+        words_list = tuple(words)
+        netags_list = tuple(netags)
+        
+        # 已收录的实体，用于按首次出现顺序去重
+        seen = {category: set() for category in entities}
+        
+        # 提取实体：S-X为单词实体，B-X开头、后接I-X/E-X的连续词语合并为一个实体
+        n_words = len(words_list)
+        i = 0
+        while i < n_words:
+            position, _, ne_type = netags_list[i].partition('-')
+            category = _LTP_NE_CATEGORIES.get(ne_type)
+            if category is None or (position != 'S' and position != 'B'):
+                i += 1
+                continue
             
-            # LTP词性标注
-            postags = self.postagger.postag(words_list)
-            postags_list = list(postags)
+            j = i + 1
+            if position == 'B':
+                inner_tags = ('I-' + ne_type, 'E-' + ne_type)
+                while j < n_words and netags_list[j] in inner_tags:
+                    j += 1
             
-            # LTP命名实体识别
-            netags = self.recognizer.recognize(words_list, postags_list)
-            netags_list = list(netags)
-            
-            # 提取实体
-            i = 0
-            while i < len(words_list):
-                # 人名 (Nh)
-                if netags_list[i] == 'S-Nh':
-                    if words_list[i] not in entities['person']:
-                        entities['person'].append(words_list[i])
-                    i += 1
-                elif netags_list[i] == 'B-Nh':
-                    j = i + 1
-                    person_name = words_list[i]
-                    while j < len(words_list) and (netags_list[j] == 'I-Nh' or netags_list[j] == 'E-Nh'):
-                        person_name += words_list[j]
-                        j += 1
-                    if person_name not in entities['person']:
-                        entities['person'].append(person_name)
-                    i = j
-                # 地名 (Ns)
-                elif netags_list[i] == 'S-Ns':
-                    if words_list[i] not in entities['place']:
-                        entities['place'].append(words_list[i])
-                    i += 1
-                elif netags_list[i] == 'B-Ns':
-                    j = i + 1
-                    place_name = words_list[i]
-                    while j < len(words_list) and (netags_list[j] == 'I-Ns' or netags_list[j] == 'E-Ns'):
-                        place_name += words_list[j]
-                        j += 1
-                    if place_name not in entities['place']:
-                        entities['place'].append(place_name)
-                    i = j
-                # 组织机构名 (Ni)
-                elif netags_list[i] == 'S-Ni':
-                    if words_list[i] not in entities['organization']:
-                        entities['organization'].append(words_list[i])
-                    i += 1
-                elif netags_list[i] == 'B-Ni':
-                    j = i + 1
-                    org_name = words_list[i]
-                    while j < len(words_list) and (netags_list[j] == 'I-Ni' or netags_list[j] == 'E-Ni'):
-                        org_name += words_list[j]
-                        j += 1
-                    if org_name not in entities['organization']:
-                        entities['organization'].append(org_name)
-                    i = j
-                else:
-                    i += 1
-            
-            return entities
-        except Exception as e:
-            logger.error(f"使用LTP提取实体失败: {e}")
-            return entities
+            entity = ''.join(words_list[i:j])
+            if entity not in seen[category]:
+                seen[category].add(entity)
+                entities[category].append(entity)
+            i = j
+        
+        return entities
 
 
 class SimpleRuleEntityExtractor(EntityExtractor):
@@ -291,41 +387,25 @@ class SimpleRuleEntityExtractor(EntityExtractor):
     简单的基于规则的实体提取器，不依赖外部模型
     """
     
+    NAME = '简单规则'
+    CATEGORIES = ('LOC', 'PER', 'ORG')
+    
     def __init__(self):
         """初始化简单规则实体提取器"""
         super().__init__()
         self.segmenter = jieba
         
         # 加载常见地点、人名、组织机构名词典
-        self.locations = set()
-        self.persons = set()
-        self.organizations = set()
-        
-        # 尝试加载词典
-        try:
-            with open('data/dictionaries/locations.txt', 'r', encoding='utf-8') as f:
-                self.locations = set([line.strip() for line in f if line.strip()])
-        except:
-            logger.warning("无法加载地点词典，将使用空词典")
-            
-        try:
-            with open('data/dictionaries/persons.txt', 'r', encoding='utf-8') as f:
-                self.persons = set([line.strip() for line in f if line.strip()])
-        except:
-            logger.warning("无法加载人名词典，将使用空词典")
-            
-        try:
-            with open('data/dictionaries/organizations.txt', 'r', encoding='utf-8') as f:
-                self.organizations = set([line.strip() for line in f if line.strip()])
-        except:
-            logger.warning("无法加载组织机构词典，将使用空词典")
+        self.locations = _load_word_set('data/dictionaries/locations.txt', '地点')
+        self.persons = _load_word_set('data/dictionaries/persons.txt', '人名')
+        self.organizations = _load_word_set('data/dictionaries/organizations.txt', '组织机构')
         
         # 添加一些常见地点、人名和组织机构
         self.locations.update(['北京', '上海', '广州', '深圳', '杭州', '南京', '武汉', '成都', '重庆', '天津'])
         self.persons.update(['习近平', '李克强', '王岐山', '马云', '马化腾', '李彦宏', '雷军'])
         self.organizations.update(['中国', '美国', '日本', '俄罗斯', '联合国', '世界卫生组织', '阿里巴巴', '腾讯', '百度', '华为'])
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def _extract_uncached(self, text: str) -> Dict[str, List[str]]:
         """
         从文本中提取实体
         
@@ -335,36 +415,14 @@ class SimpleRuleEntityExtractor(EntityExtractor):
         Returns:
             实体字典，格式为 {实体类型: [实体列表]}
         """
-        if not text:
-            return {'LOC': [], 'PER': [], 'ORG': []}
-        
-        # 分词
-        words = self.segmenter.cut(text)
-        words_list = list(words)
-        
-        # 提取实体
-        locations = []
-        persons = []
-        organizations = []
-        
-        # 基于词典匹配
-        for word in words_list:
-            if word in self.locations:
-                locations.append(word)
-            if word in self.persons:
-                persons.append(word)
-            if word in self.organizations:
-                organizations.append(word)
-        
-        # 去重
-        locations = list(set(locations))
-        persons = list(set(persons))
-        organizations = list(set(organizations))
+        # 分词，只保留不重复的词语
+        words = set(self.segmenter.lcut(text))
         
+        # 基于词典匹配：与各类词典求交集，同时完成去重
         return {
-            'LOC': locations,
-            'PER': persons,
-            'ORG': organizations
+            'LOC': list(words & self.locations),
+            'PER': list(words & self.persons),
+            'ORG': list(words & self.organizations)
         }
 
 
@@ -5,12 +5,58 @@
 """
 
 import re
+import heapq
 import logging
 from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict
+from functools import lru_cache
 
 logger = logging.getLogger('entity_optimizer')
 
+# 空集合常量，用于没有停用实体的类别
+_EMPTY = frozenset()
+
+def _entity_sort_key(entity: str) -> Tuple[int, str]:
+    """
+    实体排序键：按长度降序、字母升序
+    
+    Args:
+        entity: 实体名称
+        
+    Returns:
+        排序键
+    """
+    return -len(entity), entity
+
+
+@lru_cache(maxsize=64)
+def _compile_rule_group(rules: Tuple[str, ...]) -> Tuple[re.Pattern, ...]:
+    """
+    编译一组规则，相同的规则组在进程内只编译一次，各EntityOptimizer实例共享编译结果
+    
+    Args:
+        rules: 正则表达式规则元组
+        
+    Returns:
+        编译后的正则表达式元组
+    """
+    valid_rules = []
+    for rule in rules:
+        try:
+            re.compile(rule)
+            valid_rules.append(rule)
+        except re.error as e:
+            logger.error(f"正则表达式编译错误: {rule}, {e}")
+    
+    if not valid_rules:
+        return ()
+    
+    try:
+        return (re.compile('|'.join(f'(?:{rule})' for rule in valid_rules)),)
+    except re.error:
+        return tuple(re.compile(rule) for rule in valid_rules)
+
+
 class EntityOptimizer:
     """
     实体优化器
@@ -55,16 +101,59 @@ class EntityOptimizer:
         # 实体别名映射
         self.alias_dict = alias_dict or {}
         
-        # 编译正则表达式
-        self.compiled_rules = self._compile_rules()
+        # 编译后的正则表达式，首次使用规则识别时才编译
+        self._compiled_rules: Optional[Dict[str, List[re.Pattern]]] = None
         
-        # 停用实体列表（需要过滤的实体）
+        # 停用实体列表（需要过滤的实体），按类别缓存的frozenset在首次使用时构建
+        self._stop_sets: Optional[Dict[str, frozenset]] = None
         self.stop_entities = {
             'person': ['某某', '此人', '他', '她', '谁'],
             'place': ['这里', '那里', '此地', '何处'],
             'organization': ['该公司', '本单位', '该单位']
         }
     
+    @property
+    def stop_entities(self) -> Dict[str, List[str]]:
+        """
+        停用实体列表，格式为{类别: [实体列表]}
+        
+        Returns:
+            停用实体字典（就地修改后需调用add_stop_entity/remove_stop_entity或重新赋值）
+        """
+        return self._stop_entities
+    
+    @stop_entities.setter
+    def stop_entities(self, value: Dict[str, List[str]]) -> None:
+        self._stop_entities = value
+        self._stop_sets = None
+    
+    def _get_stop_set(self, category: str) -> frozenset:
+        """
+        获取某类别停用实体的frozenset，各类别集合只在停用实体变更后重建一次
+        
+        Args:
+            category: 实体类别
+            
+        Returns:
+            停用实体集合
+        """
+        if self._stop_sets is None:
+            self._stop_sets = {name: frozenset(entity_list)
+                               for name, entity_list in self._stop_entities.items()}
+        return self._stop_sets.get(category, _EMPTY)
+    
+    @property
+    def compiled_rules(self) -> Dict[str, List[re.Pattern]]:
+        """
+        编译后的正则表达式规则，首次访问时编译
+        
+        Returns:
+            类别到编译后正则表达式列表的字典
+        """
+        if self._compiled_rules is None:
+            self._compiled_rules = self._compile_rules()
+        return self._compiled_rules
+    
     def _compile_rules(self) -> Dict[str, List[re.Pattern]]:
         """
         编译正则表达式规则
@@ -72,15 +161,20 @@ class EntityOptimizer:
         Returns:
             编译后的正则表达式字典
         """
-        compiled_rules = {}
-        for category, rules in self.entity_rules.items():
-            compiled_rules[category] = []
-            for rule in rules:
-                try:
-                    compiled_rules[category].append(re.compile(rule))
-                except re.error as e:
-                    logger.error(f"正则表达式编译错误: {rule}, {e}")
-        return compiled_rules
+        return {category: self._compile_category_rules(rules)
+                for category, rules in self.entity_rules.items()}
+    
+    def _compile_category_rules(self, rules: List[str]) -> List[re.Pattern]:
+        """
+        将一个类别的规则合并编译为一个多选分支正则表达式，匹配时只需扫描一遍文本
+        
+        Args:
+            rules: 正则表达式规则列表
+            
+        Returns:
+            编译后的正则表达式列表，通常只有一个；规则无法合并时（如含全局标志）逐条编译
+        """
+        return list(_compile_rule_group(tuple(rules)))
     
     def add_custom_entity(self, entity: str, category: str) -> bool:
         """
@@ -127,10 +221,9 @@ class EntityOptimizer:
             try:
                 re.compile(rule)  # 测试规则是否有效
                 self.entity_rules[category].append(rule)
-                # 更新编译后的规则
-                if category not in self.compiled_rules:
-                    self.compiled_rules[category] = []
-                self.compiled_rules[category].append(re.compile(rule))
+                # 规则已编译时重新编译该类别合并后的规则，否则留待首次使用时编译
+                if self._compiled_rules is not None:
+                    self._compiled_rules[category] = self._compile_category_rules(self.entity_rules[category])
                 logger.info(f"添加实体规则: {rule} ({category})")
                 return True
             except re.error as e:
@@ -139,6 +232,49 @@ class EntityOptimizer:
         
         return False
     
+    def add_stop_entity(self, entity: str, category: str) -> bool:
+        """
+        添加停用实体
+        
+        Args:
+            entity: 实体名称
+            category: 实体类别
+            
+        Returns:
+            是否添加成功
+        """
+        if not entity or not category:
+            return False
+        
+        stop_list = self._stop_entities.setdefault(category, [])
+        if entity in stop_list:
+            return False
+        
+        stop_list.append(entity)
+        self._stop_sets = None
+        logger.info(f"添加停用实体: {entity} ({category})")
+        return True
+    
+    def remove_stop_entity(self, entity: str, category: str) -> bool:
+        """
+        移除停用实体
+        
+        Args:
+            entity: 实体名称
+            category: 实体类别
+            
+        Returns:
+            是否移除成功
+        """
+        stop_list = self._stop_entities.get(category)
+        if not stop_list or entity not in stop_list:
+            return False
+        
+        stop_list.remove(entity)
+        self._stop_sets = None
+        logger.info(f"移除停用实体: {entity} ({category})")
+        return True
+    
     def add_entity_alias(self, alias: str, standard_name: str) -> bool:
         """
         添加实体别名
@@ -172,172 +308,98 @@ class EntityOptimizer:
         
         entities = {category: [] for category in self.entity_rules}
         
-        # 使用规则匹配实体
+        # 使用规则匹配实体（取完整匹配），按首次出现顺序去重
         for category, patterns in self.compiled_rules.items():
+            category_entities = entities.setdefault(category, [])
+            seen = set()
             for pattern in patterns:
-                matches = pattern.findall(text)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            match = match[0]  # 取第一个分组
-                        if match and match not in entities[category]:
-                            entities[category].append(match)
+                for match in pattern.finditer(text):
+                    entity = match.group(0)
+                    if entity and entity not in seen:
+                        seen.add(entity)
+                        category_entities.append(entity)
         
         return entities
     
-    def optimize_entities(self, entities: Dict[str, List[str]], text: str = None) -> Dict[str, List[str]]:
+    def optimize_entities(self, entities: Dict[str, List[str]], text: str = None,
+                          top_k: Optional[int] = None) -> Dict[str, List[str]]:
         """
         优化实体识别结果
         
         Args:
             entities: 实体识别结果，格式为{类别: [实体列表]}
             text: 原文本，用于规则识别
+            top_k: 每个类别只保留排序最前的top_k个实体，None表示全部保留
             
         Returns:
             优化后的实体字典
-        """
-        # 合并自定义实体
-        optimized = self._merge_custom_entities(entities)
-        
-        # 使用规则识别
-        if text:
-            rule_entities = self.recognize_entities_by_rules(text)
-            optimized = self._merge_entities(optimized, rule_entities)
-        
-        # 过滤停用实体
-        optimized = self._filter_stop_entities(optimized)
-        
-        # 处理实体别名
-        optimized = self._process_aliases(optimized)
-        
-        # 实体去重和排序
-        optimized = self._deduplicate_and_sort(optimized)
-        
-        return optimized
-    
-    def _merge_custom_entities(self, entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """
-        合并自定义实体
-        
-        Args:
-            entities: 实体识别结果
             
-        Returns:
-            合并后的实体字典
+        Raises:
+            ValueError: top_k为负数
         """
-        merged = {category: list(entities.get(category, [])) for category in self.custom_entities}
+        # 在合并和规则识别之前检查参数
+        if top_k is not None and top_k < 0:
+            raise ValueError(f"top_k不能为负数: {top_k}")
         
-        # 添加自定义实体
-        for category, custom_list in self.custom_entities.items():
-            if category not in merged:
-                merged[category] = []
-            for entity in custom_list:
-                if entity not in merged[category]:
-                    merged[category].append(entity)
-        
-        return merged
-    
-    def _merge_entities(self, entities1: Dict[str, List[str]], entities2: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """
-        合并两个实体字典
+        entities = entities or {}
         
-        Args:
-            entities1: 第一个实体字典
-            entities2: 第二个实体字典
-            
-        Returns:
-            合并后的实体字典
-        """
-        merged = {category: list(entities1.get(category, [])) for category in set(entities1) | set(entities2)}
+        # 使用规则识别
+        rule_entities = self.recognize_entities_by_rules(text) if text else {}
         
-        # 合并第二个字典的实体
-        for category, entity_list in entities2.items():
-            if category not in merged:
-                merged[category] = []
-            for entity in entity_list:
-                if entity not in merged[category]:
-                    merged[category].append(entity)
+        # 结果类别为自定义实体类别与规则识别类别的并集（输入中的其他类别不保留）
+        categories = list(self.custom_entities)
+        categories.extend(category for category in rule_entities if category not in self.custom_entities)
         
-        return merged
-    
-    def _filter_stop_entities(self, entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """
-        过滤停用实体
+        alias_get = self.alias_dict.get
+        collected = {}
         
-        Args:
-            entities: 实体字典
+        # 每个类别一次遍历完成合并、停用实体过滤、别名处理和去重，最后统一排序
+        for category in categories:
+            stop_set = self._get_stop_set(category)
+            seen = set()
             
-        Returns:
-            过滤后的实体字典
-        """
-        filtered = {}
-        
-        for category, entity_list in entities.items():
-            filtered[category] = []
-            stop_list = self.stop_entities.get(category, [])
+            sources = (
+                entities.get(category, ()) if category in self.custom_entities else (),
+                self.custom_entities.get(category, ()),
+                rule_entities.get(category, ())
+            )
+            for entity_list in sources:
+                for entity in entity_list:
+                    if entity in stop_set:
+                        continue
+                    seen.add(alias_get(entity, entity))
             
-            for entity in entity_list:
-                if entity not in stop_list:
-                    filtered[category].append(entity)
+            collected[category] = seen
         
-        return filtered
+        return self._deduplicate_and_sort(collected, top_k)
     
-    def _process_aliases(self, entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """
-        处理实体别名
-        
-        Args:
-            entities: 实体字典
-            
-        Returns:
-            处理后的实体字典
+    def _deduplicate_and_sort(self, entities: Dict[str, Any],
+                              top_k: Optional[int] = None) -> Dict[str, List[str]]:
         """
-        processed = {}
-        
-        for category, entity_list in entities.items():
-            processed[category] = []
-            alias_map = {}  # 用于记录当前处理的别名映射
-            
-            for entity in entity_list:
-                # 检查是否为别名
-                if entity in self.alias_dict:
-                    standard_name = self.alias_dict[entity]
-                    if standard_name not in processed[category]:
-                        processed[category].append(standard_name)
-                    alias_map[entity] = standard_name
-                else:
-                    # 检查是否有其他实体是它的别名
-                    is_standard = False
-                    for alias, std in alias_map.items():
-                        if entity == std:
-                            is_standard = True
-                            break
-                    
-                    if not is_standard:
-                        processed[category].append(entity)
-        
-        return processed
-    
-    def _deduplicate_and_sort(self, entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """
-        实体去重和排序
+        实体去重并按长度降序、字母升序排序
         
         Args:
-            entities: 实体字典
+            entities: 实体字典，值为实体列表或集合
+            top_k: 每个类别只保留排序最前的top_k个实体，None表示全部保留
             
         Returns:
             去重和排序后的实体字典
+            
+        Raises:
+            ValueError: top_k为负数
         """
+        if top_k is not None and top_k < 0:
+            raise ValueError(f"top_k不能为负数: {top_k}")
+        
         result = {}
         
         for category, entity_list in entities.items():
-            # 去重
-            unique_entities = list(set(entity_list))
-            
-            # 按长度和字母顺序排序
-            unique_entities.sort(key=lambda x: (-len(x), x))
-            
-            result[category] = unique_entities
+            unique_entities = set(entity_list)
+            # 只需要少量结果时部分排序即可
+            if top_k is not None and top_k < len(unique_entities) // 2:
+                result[category] = heapq.nsmallest(top_k, unique_entities, key=_entity_sort_key)
+            else:
+                result[category] = sorted(unique_entities, key=_entity_sort_key)[:top_k]
         
         return result
     
@@ -399,14 +461,12 @@ class EntityMerger:
             
             for category, entity_list in entities.items():
                 for entity in entity_list:
-                    key = (category, entity)
-                    entity_weights[key] += source_weight
+                    entity_weights[(category, entity)] += source_weight
         
-        # 根据权重选择实体
+        # 根据权重选择实体，(类别, 实体)键唯一，无需再检查重复
         for (category, entity), weight in entity_weights.items():
             if weight >= 1.0:  # 至少有一个来源支持
-                if entity not in merged[category]:
-                    merged[category].append(entity)
+                merged[category].append(entity)
         
         return merged
 
@@ -5,7 +5,12 @@
 """
 
 import logging
-from typing import List, Dict, Tuple, Any, Optional, Set
+import multiprocessing
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional, Set, Sequence, Iterable
 import json
 import jieba
 
@@ -26,11 +31,17 @@ except ImportError:
 
 logger = logging.getLogger('relation')
 
+# 句子切分：匹配到句末标点（。！？；或换行）为止的一段文本，末尾没有标点的最后一段也单独成句
+_SENT_RE = re.compile(r'[^。！？；\n]*(?:[。！？；\n]|$)')
+
 class Triple:
     """
     三元组类，表示(主体, 谓语, 客体)的关系
     """
     
+    # 固定属性，不为每个实例创建__dict__，大量三元组时节省内存
+    __slots__ = ('subject', 'predicate', 'object', 'confidence')
+    
     def __init__(self, subject: str, predicate: str, object: str, confidence: float = 1.0) -> None:
         """
         初始化三元组
@@ -69,11 +80,19 @@ class RelationExtractor:
     关系提取器基类
     """
     
+    # 提取器名称，用于日志
+    NAME = '关系提取器'
+    
+    # 句子级三元组缓存的最大条目数
+    SENTENCE_CACHE_SIZE = 4096
+    
     def __init__(self) -> None:
         """
         初始化关系提取器
         """
-        pass
+        # 句子三元组缓存：句子 -> 三元组元组，按最近使用顺序淘汰；新闻中的导语、署名等重复句子只分析一次
+        self._sentence_cache: OrderedDict = OrderedDict()
+        self._sentence_cache_lock = threading.Lock()
     
     def extract_triples(self, text: str) -> List[Triple]:
         """
@@ -87,21 +106,86 @@ class RelationExtractor:
         """
         raise NotImplementedError("子类必须实现此方法")
     
-    def batch_extract_triples(self, text_list: List[str]) -> List[List[Triple]]:
+    def batch_extract_triples(self, text_list: List[str], max_workers: int = 1) -> List[List[Triple]]:
         """
         批量提取多个文本中的三元组关系
         
         Args:
             text_list: 文本列表
+            max_workers: 并行线程数，大于1时多线程处理（HanLP调用Java、LTP调用C++期间会释放GIL）
             
         Returns:
-            每个文本的三元组列表
+            每个文本的三元组列表，顺序与text_list一致
         """
-        results = []
-        for text in text_list:
-            triples = self.extract_triples(text)
-            results.append(triples)
-        return results
+        if max_workers <= 1 or len(text_list) <= 1:
+            return [self.extract_triples(text) for text in text_list]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.extract_triples, text_list))
+    
+    def _extract_sentence_triples(self, sentence: str) -> List[Triple]:
+        """
+        提取单个句子中的三元组关系，分析失败时直接抛出异常，由_cached_sentence_triples统一处理
+        
+        Args:
+            sentence: 待处理句子
+            
+        Returns:
+            三元组列表
+        """
+        raise NotImplementedError("子类必须实现此方法")
+    
+    def _extract_unique_triples(self, text: str) -> List[Triple]:
+        """
+        分句提取文本中的三元组关系，同一(主体, 谓语, 客体)在多个句子中出现时只保留第一次
+        
+        Args:
+            text: 待处理文本
+            
+        Returns:
+            去重后的三元组列表，按首次出现的顺序排列
+        """
+        triples = []
+        seen = set()
+        
+        for sentence in self.split_sentences(text):
+            for triple in self._cached_sentence_triples(sentence):
+                key = (triple.subject, triple.predicate, triple.object)
+                if key not in seen:
+                    seen.add(key)
+                    triples.append(triple)
+        
+        return triples
+    
+    def _cached_sentence_triples(self, sentence: str) -> List[Triple]:
+        """
+        提取单个句子中的三元组关系，相同句子直接返回缓存结果
+        
+        提取失败时记录日志并返回空列表，失败结果不放入缓存，下次遇到该句子时重新分析
+        
+        Args:
+            sentence: 待处理句子
+            
+        Returns:
+            三元组列表（副本，调用方修改不会影响缓存）
+        """
+        with self._sentence_cache_lock:
+            cached = self._sentence_cache.get(sentence)
+            if cached is not None:
+                self._sentence_cache.move_to_end(sentence)
+        
+        if cached is None:
+            try:
+                cached = tuple(self._extract_sentence_triples(sentence))
+            except Exception as e:
+                logger.error(f"使用{self.NAME}提取三元组失败: {e}")
+                return []
+            with self._sentence_cache_lock:
+                self._sentence_cache[sentence] = cached
+                if len(self._sentence_cache) > self.SENTENCE_CACHE_SIZE:
+                    self._sentence_cache.popitem(last=False)
+        
+        return [Triple(t.subject, t.predicate, t.object, t.confidence) for t in cached]
     
     @staticmethod
     def split_sentences(text: str) -> List[str]:
@@ -114,25 +198,8 @@ class RelationExtractor:
         Returns:
             句子列表
         """
-        # 简单的句子分割规则
-        delimiters = ['。', '！', '？', '；', '\n']
-        sentences = []
-        start = 0
-        
-        for i, char in enumerate(text):
-            if char in delimiters:
-                sentence = text[start:i+1].strip()
-                if sentence:
-                    sentences.append(sentence)
-                start = i + 1
-        
-        # 添加最后一个句子
-        if start < len(text):
-            sentence = text[start:].strip()
-            if sentence:
-                sentences.append(sentence)
-        
-        return sentences
+        # 由正则表达式一次切分，去掉首尾空白后丢弃空句
+        return [sentence for sentence in (match.strip() for match in _SENT_RE.findall(text)) if sentence]
 
 
 class HanLPRelationExtractor(RelationExtractor):
@@ -140,6 +207,8 @@ class HanLPRelationExtractor(RelationExtractor):
     基于HanLP的关系提取器
     """
     
+    NAME = 'HanLP'
+    
     def __init__(self) -> None:
         """
         初始化HanLP关系提取器
@@ -162,16 +231,7 @@ class HanLPRelationExtractor(RelationExtractor):
         if not text:
             return []
         
-        triples = []
-        
-        # 分割句子
-        sentences = self.split_sentences(text)
-        
-        for sentence in sentences:
-            sentence_triples = self._extract_sentence_triples(sentence)
-            triples.extend(sentence_triples)
-        
-        return triples
+        return self._extract_unique_triples(text)
     
     def _extract_sentence_triples(self, sentence: str) -> List[Triple]:
         """
@@ -183,15 +243,11 @@ class HanLPRelationExtractor(RelationExtractor):
         Returns:
             三元组列表
         """
-        try:
-            # 使用HanLP进行依存句法分析
-            dependency_parse = HanLP.parseDependency(sentence)
-            
-            # 提取主谓宾关系
-            return self._extract_spo_from_dependency(dependency_parse)
-        except Exception as e:
-            logger.error(f"使用HanLP提取三元组失败: {e}")
-            return []
+        # 使用HanLP进行依存句法分析
+        dependency_parse = HanLP.parseDependency(sentence)
+        
+        # 提取主谓宾关系
+        return self._extract_spo_from_dependency(dependency_parse)
     
     def _extract_spo_from_dependency(self, dependency_parse) -> List[Triple]:
         """
@@ -205,29 +261,33 @@ class HanLPRelationExtractor(RelationExtractor):
         """
         triples = []
         
-        # 获取词和依存关系
-        words = []
-        for word in dependency_parse.getWordArray():
-            words.append(word)
+        # 获取词和依存关系：每个属性访问都要经过JVM，一次遍历读入Python列表，后续只访问本地数据
+        ids, lemmas, postags, deprels = [], [], [], []
+        children = {}
+        for index, word in enumerate(dependency_parse.getWordArray()):
+            ids.append(word.ID)
+            lemmas.append(word.LEMMA)
+            postags.append(word.POSTAG)
+            deprels.append(word.DEPREL)
+            # 建立中心词ID到依存词下标的索引，查找某个谓语的主语和宾语时无需再扫描全部词语
+            children.setdefault(word.HEAD.ID, []).append(index)
         
         # 遍历每个词，寻找动词谓语
-        for word in words:
+        for i, postag in enumerate(postags):
             # 谓语通常是动词
-            if word.POSTAG.startswith('v'):
-                predicate = word.LEMMA
+            if postag.startswith('v'):
+                predicate = lemmas[i]
                 subject = None
                 objects = []
                 
-                # 查找主语（通常依存关系为"主语"）
-                for w in words:
-                    if w.DEPREL == '主语' and w.HEAD.ID == word.ID:
-                        subject = w.LEMMA
-                        break
-                
-                # 查找宾语（通常依存关系为"宾语"）
-                for w in words:
-                    if w.DEPREL == '宾语' and w.HEAD.ID == word.ID:
-                        objects.append(w.LEMMA)
+                # 查找主语（通常依存关系为"主语"，取第一个）和宾语（通常依存关系为"宾语"）
+                for j in children.get(ids[i], ()):
+                    relation = deprels[j]
+                    if relation == '主语':
+                        if subject is None:
+                            subject = lemmas[j]
+                    elif relation == '宾语':
+                        objects.append(lemmas[j])
                 
                 # 构建三元组
                 if subject and objects:
@@ -243,6 +303,8 @@ class LTPRelationExtractor(RelationExtractor):
     基于LTP的关系提取器
     """
     
+    NAME = 'LTP'
+    
     def __init__(self, segmentor_model: str, postagger_model: str, parser_model: str) -> None:
         """
         初始化LTP关系提取器
@@ -308,16 +370,7 @@ class LTPRelationExtractor(RelationExtractor):
         if not text:
             return []
         
-        triples = []
-        
-        # 分割句子
-        sentences = self.split_sentences(text)
-        
-        for sentence in sentences:
-            sentence_triples = self._extract_sentence_triples(sentence)
-            triples.extend(sentence_triples)
-        
-        return triples
+        return self._extract_unique_triples(text)
     
     def _extract_sentence_triples(self, sentence: str) -> List[Triple]:
         """
@@ -329,26 +382,15 @@ class LTPRelationExtractor(RelationExtractor):
         Returns:
             三元组列表
         """
-        try:
-            # LTP分词
-            words = self.segmentor.segment(sentence)
-            words_list = list(words)
-            
-            # LTP词性标注
-            postags = self.postagger.postag(words_list)
-            postags_list = list(postags)
-            
-            # LTP依存句法分析
-            arcs = self.parser.parse(words_list, postags_list)
-            arcs_list = list(arcs)
-            
-            # 提取主谓宾关系
-            return self._extract_spo_from_arcs(words_list, postags_list, arcs_list)
-        except Exception as e:
-            logger.error(f"使用LTP提取三元组失败: {e}")
-            return []
+        # LTP分词、词性标注和依存句法分析，中间结果直接以LTP返回的向量传递
+        words = self.segmentor.segment(sentence)
+        postags = self.postagger.postag(words)
+        arcs = self.parser.parse(words, postags)
+        
+        # 提取主谓宾关系：词性和依存弧各只遍历一次，无需转换；词语需要按下标访问，转换一次
+        return self._extract_spo_from_arcs(tuple(words), postags, arcs)
     
-    def _extract_spo_from_arcs(self, words: List[str], postags: List[str], arcs: List[Any]) -> List[Triple]:
+    def _extract_spo_from_arcs(self, words: Sequence[str], postags: Iterable[str], arcs: Iterable[Any]) -> List[Triple]:
         """
         从依存句法分析结果中提取主谓宾三元组
         
@@ -362,22 +404,24 @@ class LTPRelationExtractor(RelationExtractor):
         """
         triples = []
         
-        for i, (word, pos, arc) in enumerate(zip(words, postags, arcs)):
+        # 一次遍历建立中心词序号到(依存词下标, 依存关系)的索引（依存弧的中心词序号从1开始）
+        children = {}
+        for j, dependency in enumerate(arcs):
+            children.setdefault(dependency.head, []).append((j, dependency.relation))
+        
+        for i, (word, pos) in enumerate(zip(words, postags)):
             # 谓语通常是动词
             if pos.startswith('v'):
                 predicate = word
                 subject = None
                 objects = []
                 
-                # 查找主语（通常依存关系为"SBV"）
-                for j, dependency in enumerate(arcs):
-                    if dependency.relation == 'SBV' and dependency.head == i + 1:  # 注意：依存弧的索引从1开始
-                        subject = words[j]
-                        break
-                
-                # 查找宾语（通常依存关系为"VOB"）
-                for j, dependency in enumerate(arcs):
-                    if dependency.relation == 'VOB' and dependency.head == i + 1:
+                # 查找主语（通常依存关系为"SBV"，取第一个）和宾语（通常依存关系为"VOB"）
+                for j, relation in children.get(i + 1, ()):
+                    if relation == 'SBV':
+                        if subject is None:
+                            subject = words[j]
+                    elif relation == 'VOB':
                         objects.append(words[j])
                 
                 # 构建三元组
@@ -394,20 +438,22 @@ class SimpleRuleRelationExtractor(RelationExtractor):
     简单的基于规则的关系提取器，不依赖外部模型
     """
     
+    NAME = '简单规则'
+    
     def __init__(self):
         """初始化简单规则关系提取器"""
         super().__init__()
         self.segmenter = jieba
         
         # 常见谓语动词
-        self.predicates = {
+        self.predicates = frozenset({
             '访问', '会见', '会晤', '参观', '考察', '视察', '调研', 
             '表示', '强调', '指出', '认为', '说', '表明', '宣布',
             '签署', '签订', '缔结', '达成', '同意', '批准', '通过',
             '任命', '委任', '授予', '颁发', '授权', '批准', '同意',
             '购买', '收购', '出售', '转让', '投资', '融资', '贷款',
             '研发', '生产', '制造', '销售', '推广', '发布', '上市'
-        }
+        })
     
     def extract_triples(self, text: str) -> List[Triple]:
         """
@@ -422,81 +468,113 @@ class SimpleRuleRelationExtractor(RelationExtractor):
         if not text:
             return []
         
-        # 分句
-        sentences = self._split_sentences(text)
+        return self._extract_unique_triples(text)
+    
+    def _extract_sentence_triples(self, sentence: str) -> List[Triple]:
+        """
+        提取单个句子中的三元组关系
         
-        # 存储提取的三元组
+        Args:
+            sentence: 待处理句子
+            
+        Returns:
+            三元组列表
+        """
         triples = []
         
-        # 处理每个句子
-        for sentence in sentences:
-            # 分词
-            words = list(self.segmenter.cut(sentence))
-            
-            # 查找主语、谓语和宾语
-            subject = None
-            predicate = None
-            object_ = None
-            
-            # 简单规则：查找第一个可能的主语、谓语和宾语
-            for i, word in enumerate(words):
-                # 如果找到谓语
-                if word in self.predicates:
-                    predicate = word
-                    
-                    # 尝试找主语（谓语前的词）
-                    for j in range(i-1, -1, -1):
-                        if len(words[j]) >= 2 and words[j] not in self.predicates:
-                            subject = words[j]
-                            break
-                    
-                    # 尝试找宾语（谓语后的词）
-                    for j in range(i+1, len(words)):
-                        if len(words[j]) >= 2 and words[j] not in self.predicates:
-                            object_ = words[j]
-                            break
+        # 循环中频繁使用的属性绑定为局部变量
+        predicates = self.predicates
+        
+        # 分词
+        words = self.segmenter.lcut(sentence)
+        n_words = len(words)
+        
+        # 查找主语、谓语和宾语
+        subject = None
+        predicate = None
+        object_ = None
+        
+        # 简单规则：查找第一个可能的主语、谓语和宾语
+        for i, word in enumerate(words):
+            # 如果找到谓语
+            if word in predicates:
+                predicate = word
+                
+                # 尝试找主语（谓语前的词）
+                for j in range(i-1, -1, -1):
+                    candidate = words[j]
+                    if len(candidate) >= 2 and candidate not in predicates:
+                        subject = candidate
+                        break
+                
+                # 尝试找宾语（谓语后的词）
+                for j in range(i+1, n_words):
+                    candidate = words[j]
+                    if len(candidate) >= 2 and candidate not in predicates:
+                        object_ = candidate
+                        break
+                
+                # 如果找到了完整的三元组
+                if subject and predicate and object_:
+                    triple = Triple(subject, predicate, object_, confidence=0.7)
+                    triples.append(triple)
                     
-                    # 如果找到了完整的三元组
-                    if subject and predicate and object_:
-                        triple = Triple(subject, predicate, object_, confidence=0.7)
-                        triples.append(triple)
-                        
-                        # 重置，继续查找下一个三元组
-                        subject = None
-                        predicate = None
-                        object_ = None
+                    # 重置，继续查找下一个三元组
+                    subject = None
+                    predicate = None
+                    object_ = None
         
         return triples
     
-    def _split_sentences(self, text: str) -> List[str]:
+    def batch_extract_triples(self, text_list: List[str], max_workers: int = 1) -> List[List[Triple]]:
         """
-        将文本分割为句子
+        批量提取多个文本中的三元组关系
+        
+        规则匹配和jieba分词都是纯Python计算，多线程受GIL限制，因此使用多进程并行；
+        每个工作进程启动时需要重新加载jieba词典，适合较大的批量
         
         Args:
-            text: 输入文本
+            text_list: 文本列表
+            max_workers: 并行进程数，大于1时多进程处理
             
         Returns:
-            句子列表
-        """
-        # 使用常见的句子分隔符分割文本
-        delimiters = ['。', '！', '？', '；', '\n']
-        sentences = []
-        start = 0
-        
-        for i, char in enumerate(text):
-            if char in delimiters:
-                sentence = text[start:i+1].strip()
-                if sentence:
-                    sentences.append(sentence)
-                start = i + 1
-        
-        # 处理最后一个句子
-        if start < len(text):
-            sentence = text[start:].strip()
-            if sentence:
-                sentences.append(sentence)
-        
-        return sentences
+            每个文本的三元组列表，顺序与text_list一致
+        """
+        if max_workers <= 1 or len(text_list) <= 1:
+            return [self.extract_triples(text) for text in text_list]
+        
+        chunksize = max(1, len(text_list) // (8 * max_workers))
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_simple_worker
+        ) as executor:
+            return list(executor.map(_simple_worker_extract, text_list, chunksize=chunksize))
+
+
+# 多进程批量提取时，每个工作进程各自持有的简单规则关系提取器
+_worker_simple_extractor: Optional['SimpleRuleRelationExtractor'] = None
+
+
+def _init_simple_worker() -> None:
+    """
+    初始化工作进程的简单规则关系提取器，作为进程池的initializer
+    """
+    global _worker_simple_extractor
+    _worker_simple_extractor = SimpleRuleRelationExtractor()
+
+
+def _simple_worker_extract(text: str) -> List[Triple]:
+    """
+    在工作进程中提取单个文本的三元组关系
+    
+    Args:
+        text: 待处理文本
+        
+    Returns:
+        三元组列表
+    """
+    return _worker_simple_extractor.extract_triples(text)
 
 
 # 工厂函数，根据需求创建关系提取器
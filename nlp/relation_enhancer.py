@@ -18,6 +18,8 @@ except ImportError:
         """
         三元组类，表示(主体, 谓语, 客体)的关系
         """
+        __slots__ = ('subject', 'predicate', 'object', 'confidence')
+        
         def __init__(self, subject: str, predicate: str, object: str, confidence: float = 1.0) -> None:
             self.subject = subject
             self.predicate = predicate
@@ -7,7 +7,7 @@
 import os
 import re
 import logging
-from typing import List, Tuple, Optional, Set, Dict, Any
+from typing import List, Tuple, Optional, Set, FrozenSet, Dict, Any
 from collections import defaultdict
 
 # 第三方库导入
@@ -47,6 +47,8 @@ class Segmenter:
         )
         # 加载默认停用词
         self.stopwords = self._load_stopwords(self.default_stopwords_file)
+        # 其他停用词文件的加载结果缓存，避免每次过滤都重新读取文件
+        self._stopwords_cache: Dict[str, FrozenSet[str]] = {}
     
     def segment(self, text: str) -> List[str]:
         """
@@ -83,9 +85,12 @@ class Segmenter:
         Returns:
             过滤停用词后的分词结果
         """
-        # 如果提供了新的停用词文件，则重新加载
+        # 如果提供了新的停用词文件，则加载（同一文件只加载一次）
         if stopwords_file and stopwords_file != self.default_stopwords_file:
-            stopwords = self._load_stopwords(stopwords_file)
+            stopwords = self._stopwords_cache.get(stopwords_file)
+            if stopwords is None:
+                stopwords = frozenset(self._load_stopwords(stopwords_file))
+                self._stopwords_cache[stopwords_file] = stopwords
         else:
             stopwords = self.stopwords
         
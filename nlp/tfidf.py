@@ -5,6 +5,7 @@ TF-IDF关键词提取模块
 """
 
 import math
+import heapq
 import numpy as np
 from typing import List, Dict, Tuple, Any, Optional
 import logging
@@ -48,11 +49,8 @@ class TFIDF:
             doc_list: 文档列表，每个文档是分词后的词语列表
         """
         for doc in doc_list:
-            # 每个文档中出现的唯一词语
-            term_set = set(doc)
-            # 更新文档频率
-            for term in term_set:
-                self.doc_freq[term] += 1
+            # 按文档中出现的唯一词语更新文档频率
+            self.doc_freq.update(set(doc))
             
             # 更新文档数
             self.n_docs += 1
@@ -69,9 +67,11 @@ class TFIDF:
             logger.warning("没有文档，无法计算IDF")
             return
         
-        # 计算每个词的IDF值
-        for term, freq in self.doc_freq.items():
-            self.idf[term] = math.log(self.n_docs / (1 + freq))
+        # 对全部词语的文档频率一次性向量化计算IDF值
+        terms = list(self.doc_freq.keys())
+        freqs = np.fromiter(self.doc_freq.values(), dtype=np.float64, count=len(terms))
+        idf_values = np.log(self.n_docs / (1.0 + freqs))
+        self.idf = dict(zip(terms, idf_values.tolist()))
     
     def calculate_tf(self, doc: List[str]) -> Dict[str, float]:
         """
@@ -147,11 +147,8 @@ class TFIDF:
         # 计算TF-IDF值
         tfidf = self.calculate_tfidf(doc)
         
-        # 排序，获取top_k个关键词
-        sorted_tfidf = sorted(tfidf.items(), key=lambda x: x[1], reverse=True)
-        
-        # 返回top_k个关键词
-        return sorted_tfidf[:top_k]
+        # 只选出top_k个关键词，无需对全部词语排序（结果与完整排序后截取相同）
+        return heapq.nlargest(top_k, tfidf.items(), key=lambda x: x[1])
     
     def batch_extract_keywords(self, doc_list: List[List[str]], top_k: int = 5) -> List[List[Tuple[str, float]]]:
         """
@@ -166,9 +163,19 @@ class TFIDF:
         """
         results = []
         
+        # 未登录词的默认IDF值与idf字典的查找方法在整批文档中不变，只取一次
+        default_idf = math.log(self.n_docs) if self.n_docs > 0 else 0.0
+        idf_get = self.idf.get
+        
         for doc in doc_list:
-            keywords = self.extract_keywords(doc, top_k)
-            results.append(keywords)
+            if not doc:
+                results.append([])
+                continue
+            
+            doc_len = len(doc)
+            scores = [(term, count / doc_len * idf_get(term, default_idf))
+                      for term, count in Counter(doc).items()]
+            results.append(heapq.nlargest(top_k, scores, key=lambda x: x[1]))
         
         return results
 
@@ -239,6 +246,20 @@ class TFIDFExtractor:
         
         return keywords
     
+    def extract_corpus_keywords(self, top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        提取语料库中每个文档的关键词
+        
+        直接复用 add_corpus 时的分词结果，不再对文本重复分词
+        
+        Args:
+            top_k: 每个文档返回的关键词数量
+            
+        Returns:
+            每个文档的关键词列表，顺序与添加语料库时的文本顺序一致
+        """
+        return self.tfidf.batch_extract_keywords(self.tfidf.docs, top_k)
+    
     def batch_extract_keywords(self, text_list: List[str], top_k: int = 5) -> List[List[Tuple[str, float]]]:
         """
         批量从多个文本中提取关键词
@@ -5,6 +5,8 @@
 """
 
 from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 from typing import List, Dict, Any, Optional
 import logging
 import re
@@ -14,6 +16,44 @@ import json
 
 logger = logging.getLogger('parser')
 
+# 预编译的正则表达式，在模块导入时编译一次，供所有解析器实例共享
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 新浪新闻文章URL：常规新闻/财经/体育/科技/娱乐，以及简化的 .shtml/.html 模式
+_SINA_ARTICLE_URL_RE = re.compile(
+    r'https?://(?:news|finance|sports|tech|ent)\.sina\.com\.cn/'
+    r'(?:[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml|.*\.shtml|.*\.html)'
+)
+
+# 豆瓣电影列表页链接的XPath，编译一次后复用
+_DOUBAN_SLIDE_ITEM_HREFS = etree.XPath(
+    '//*[contains(concat(" ", normalize-space(@class), " "), " ui-slide-item ")]/descendant::a[1]/@href'
+)
+_DOUBAN_REVIEW_LINK_HREFS = etree.XPath(
+    '//a[contains(concat(" ", normalize-space(@class), " "), " review-link ")]/@href'
+)
+_DOUBAN_RANK_LINK_HREFS = etree.XPath('//a[contains(@href, "/top250")]/@href')
+
+# 通用解析器的文章URL特征
+_ARTICLE_URL_RE = re.compile('|'.join([
+    r'/article/', r'/articles/', r'/news/', r'/post/', r'/posts/',
+    r'/blog/', r'/blogs/', r'/content/', r'/story/', r'/stories/',
+    r'/view/', r'/read/', r'/detail/', r'/\d{4}/', r'/p/', r'/a/',
+    r'\.html', r'\.shtml', r'\.htm', r'\.asp', r'\.aspx', r'\.php',
+    r'/doc-', r'/newsdetail', r'/newsinfo',
+]), re.IGNORECASE)
+
+# 通用解析器排除的URL特征
+_EXCLUDE_URL_RE = re.compile('|'.join([
+    r'/tag/', r'/tags/', r'/category/', r'/categories/', r'/search/',
+    r'/login', r'/register', r'/signup', r'/download', r'/about/',
+    r'/contact', r'/help/', r'/support/', r'/faq', r'/terms/',
+    r'/privacy', r'/sitemap', r'/rss/', r'/feed/', r'/comment/',
+    r'/comments/', r'/page/', r'/pages/', r'/images?', r'/videos?/',
+    r'/user/', r'/profile/', r'/member/', r'/members/', r'/author/',
+]), re.IGNORECASE)
+
 class BaseParser:
     """
     解析器基类
@@ -83,9 +123,9 @@ class BaseParser:
             return ""
         
         # 去除HTML标签
-        text = re.sub(r'<[^>]+>', ' ', text)
+        text = _HTML_TAG_RE.sub(' ', text)
         # 替换多个空白字符为单个空格
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # 去除首尾空白
         return text.strip()
     
@@ -471,30 +511,8 @@ class SinaNewsParser(BaseParser):
         Returns:
             是否为新浪新闻文章链接
         """
-        # 新浪新闻文章URL通常包含特定路径
-        patterns = [
-            r'https?://news\.sina\.com\.cn/[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml',  # 常规新闻
-            r'https?://finance\.sina\.com\.cn/[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml',  # 财经新闻
-            r'https?://sports\.sina\.com\.cn/[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml',  # 体育新闻
-            r'https?://tech\.sina\.com\.cn/[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml',  # 科技新闻
-            r'https?://ent\.sina\.com\.cn/[a-z]/[\w-]+/\d+-\d+-\d+/doc-[a-z0-9]+\.shtml',  # 娱乐新闻
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, url):
-                return True
-        
-        # 简化的模式也可以识别大部分新闻URL
-        simplified_patterns = [
-            r'https?://(news|finance|sports|tech|ent)\.sina\.com\.cn/.*\.shtml',
-            r'https?://(news|finance|sports|tech|ent)\.sina\.com\.cn/.*\.html',
-        ]
-        
-        for pattern in simplified_patterns:
-            if re.match(pattern, url):
-                return True
-        
-        return False
+        # 常规及简化模式合并为模块级预编译正则，避免每个链接重复查找正则缓存
+        return _SINA_ARTICLE_URL_RE.match(url) is not None
     
     def parse_article(self, html: str, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -633,36 +651,10 @@ class GeneralParser(BaseParser):
         Returns:
             是否可能是文章链接
         """
-        # 常见的文章URL特征
-        article_indicators = [
-            r'/article/', r'/articles/', r'/news/', r'/post/', r'/posts/',
-            r'/blog/', r'/blogs/', r'/content/', r'/story/', r'/stories/',
-            r'/view/', r'/read/', r'/detail/', r'/\d{4}/', r'/p/', r'/a/',
-            r'\.html', r'\.shtml', r'\.htm', r'\.asp', r'\.aspx', r'\.php',
-            r'/doc-', r'/newsdetail', r'/newsinfo',
-        ]
-        
-        # 排除的URL特征
-        exclude_indicators = [
-            r'/tag/', r'/tags/', r'/category/', r'/categories/', r'/search/',
-            r'/login', r'/register', r'/signup', r'/download', r'/about/',
-            r'/contact', r'/help/', r'/support/', r'/faq', r'/terms/',
-            r'/privacy', r'/sitemap', r'/rss/', r'/feed/', r'/comment/',
-            r'/comments/', r'/page/', r'/pages/', r'/images?', r'/videos?/',
-            r'/user/', r'/profile/', r'/member/', r'/members/', r'/author/',
-        ]
-        
-        # 首先检查排除特征
-        for pattern in exclude_indicators:
-            if re.search(pattern, url, re.IGNORECASE):
-                return False
-        
-        # 然后检查文章特征
-        for pattern in article_indicators:
-            if re.search(pattern, url, re.IGNORECASE):
-                return True
-        
-        return False
+        # 首先检查排除特征，然后检查文章特征
+        if _EXCLUDE_URL_RE.search(url):
+            return False
+        return _ARTICLE_URL_RE.search(url) is not None
     
     def parse_article(self, html: str, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -777,45 +769,31 @@ class DoubanMovieParser(BaseParser):
         Returns:
             电影URL列表
         """
-        links = []
+        if not html:
+            return []
+        
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            # 直接用lxml的XPath取href字符串，不构建BeautifulSoup对象树
+            doc = lxml_html.fromstring(html)
+            links = []
             
-            # 获取正在热映电影
-            now_playing = soup.select('.screening-bd .ui-slide-item')
-            for item in now_playing:
-                a_tag = item.select_one('a')
-                if a_tag and 'href' in a_tag.attrs:
-                    movie_url = a_tag['href'].strip()
-                    links.append(movie_url)
-            
-            # 获取热门电影
-            hot_movies = soup.select('.ui-slide-item')
-            for item in hot_movies:
-                a_tag = item.select_one('a')
-                if a_tag and 'href' in a_tag.attrs:
-                    movie_url = a_tag['href'].strip()
-                    links.append(movie_url)
+            # 获取热映及热门电影（.ui-slide-item 已包含 .screening-bd 下的条目）
+            for href in _DOUBAN_SLIDE_ITEM_HREFS(doc):
+                links.append(href.strip())
             
             # 获取电影详情页中的影评链接
-            review_links = soup.select('a.review-link')
-            for link in review_links:
-                if 'href' in link.attrs:
-                    review_url = link['href'].strip()
-                    if review_url.startswith('/review'):
-                        review_url = urljoin(self.base_url, review_url)
-                    links.append(review_url)
+            for href in _DOUBAN_REVIEW_LINK_HREFS(doc):
+                review_url = href.strip()
+                if review_url.startswith('/review'):
+                    review_url = urljoin(self.base_url, review_url)
+                links.append(review_url)
             
             # 提取排行榜链接
-            rank_links = soup.select('a[href*="/top250"]')
-            for link in rank_links:
-                if 'href' in link.attrs:
-                    rank_url = link['href'].strip()
-                    rank_url = urljoin(self.base_url, rank_url)
-                    links.append(rank_url)
-            
-            # 去重
-            links = list(set(links))
+            for href in _DOUBAN_RANK_LINK_HREFS(doc):
+                links.append(urljoin(self.base_url, href.strip()))
+            
+            # 去重，保持发现顺序
+            links = list(dict.fromkeys(links))
             
             logger.info(f"从页面提取到 {len(links)} 个可能的电影或影评链接")
             return links
@@ -5,21 +5,30 @@
 """
 
 import os
+import copy
 import time
 import random
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from typing import List, Dict, Optional, Any, Set
+from typing import List, Dict, Optional, Any, Set, Callable
 import logging
-import pandas as pd
 import threading
 import queue
 import concurrent.futures
 import hashlib
 import json
+import csv
 from urllib.parse import urljoin, urlparse
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# 尝试导入orjson（可选，用于加速已访问URL记录的序列化）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # 导入解析器
 from spider.parser import get_parser
@@ -32,6 +41,204 @@ logging.basicConfig(
 )
 logger = logging.getLogger('spider')
 
+# 固定的请求头，模块加载时构建一次，避免每次请求重新创建字典
+_BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+# 随机请求头使用的User-Agent池，直接内置，无需fake_useragent在运行时加载数据
+_UA_POOL = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+)
+
+_PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+}
+
+# 服务器要求等待的最长时间（秒），超过则按此值等待，避免单次限流阻塞过久
+MAX_RETRY_AFTER = 60.0
+
+# 所有爬虫会话共享的连接池适配器，复用连接避免每次请求重新握手
+_shared_adapter: Optional[HTTPAdapter] = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter() -> HTTPAdapter:
+    """
+    获取所有爬虫会话共享的连接池适配器
+    
+    urllib3连接池是线程安全的，可在多个会话和工作线程之间共享；
+    重试由get_page自行控制，因此适配器不做额外重试。
+    
+    Returns:
+        共享的HTTPAdapter实例
+    """
+    global _shared_adapter
+    
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+    
+    return _shared_adapter
+
+
+def create_session() -> requests.Session:
+    """
+    创建挂载共享连接池的HTTP会话
+    
+    Cookie和请求头保存在会话中，不同爬虫、不同线程各自使用独立的会话，
+    只共享底层连接池。
+    
+    Returns:
+        新的requests.Session实例
+    """
+    session = requests.Session()
+    adapter = get_shared_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限速器
+    
+    按固定速率补充令牌，所有线程共享同一个桶，总请求速率不随线程数变化
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """
+        初始化限速器
+        
+        Args:
+            rate: 每秒补充的令牌数，即允许的平均请求速率
+            capacity: 桶容量，即允许的最大突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+                self.last_time = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_time = (1 - self.tokens) / self.rate
+            
+            # 在锁外等待，不阻塞其他线程补充令牌
+            time.sleep(wait_time)
+
+
+def _parse_retry_after(value: Optional[str], default: float) -> float:
+    """
+    解析 Retry-After 响应头，得到重试前需要等待的秒数
+    
+    支持秒数和HTTP日期两种格式，结果限制在 [0, MAX_RETRY_AFTER] 之间
+    
+    Args:
+        value: Retry-After 响应头的值
+        default: 响应头缺失或无法解析时的等待秒数
+        
+    Returns:
+        等待秒数
+    """
+    if not value:
+        return default
+    
+    try:
+        wait_time = float(value)
+    except ValueError:
+        try:
+            retry_time = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return default
+        if retry_time.tzinfo is None:
+            retry_time = retry_time.replace(tzinfo=timezone.utc)
+        wait_time = (retry_time - datetime.now(timezone.utc)).total_seconds()
+    
+    return min(max(wait_time, 0.0), MAX_RETRY_AFTER)
+
+
+def _to_csv_value(value: Any) -> Any:
+    """
+    将文章字段转换为可写入CSV的值
+    
+    列表和字典编码为JSON字符串，NaN（从已有CSV加载的空值）写为空字符串
+    
+    Args:
+        value: 字段值
+        
+    Returns:
+        可写入CSV的值
+    """
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, float) and value != value:
+        return ''
+    return value
+
+
+def _remove_file(path: str) -> None:
+    """
+    删除文件，文件不存在或无法删除时忽略
+    
+    Args:
+        path: 文件路径
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def write_articles_csv(articles: List[Dict[str, Any]], csv_file: str, encoding: str = 'utf-8') -> None:
+    """
+    将文章列表逐行写入CSV文件，无需构建DataFrame
+    
+    先写入临时文件再原子替换，写入中断时旧文件仍然完整；写入失败时删除临时文件并抛出异常
+    
+    Args:
+        articles: 文章列表
+        csv_file: 输出文件路径
+        encoding: 文件编码
+    """
+    # 字段为所有文章键的并集，保持首次出现的顺序
+    fieldnames = list(dict.fromkeys(key for article in articles for key in article))
+    
+    tmp_file = csv_file + '.tmp'
+    try:
+        with open(tmp_file, 'w', encoding=encoding, newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for article in articles:
+                writer.writerow({key: _to_csv_value(value) for key, value in article.items()})
+        os.replace(tmp_file, csv_file)
+    except Exception:
+        # 删除写了一半的临时文件，异常交由调用方处理
+        _remove_file(tmp_file)
+        raise
+
+
 class ArticleSpider:
     """
     文章爬虫类
@@ -39,6 +246,9 @@ class ArticleSpider:
     用于爬取指定网站的文章内容
     """
     
+    # 解析结果缓存的最大条目数
+    PARSE_CACHE_SIZE = 256
+    
     def __init__(
         self,
         base_url: str,
@@ -53,7 +263,8 @@ class ArticleSpider:
         incremental: bool = False,
         use_proxy: bool = False,
         proxy_file: str = 'proxies.json',
-        proxy_pool: Optional[ProxyPool] = None
+        proxy_pool: Optional[ProxyPool] = None,
+        session: Optional[requests.Session] = None
     ):
         """
         初始化爬虫
@@ -72,6 +283,7 @@ class ArticleSpider:
             use_proxy: 是否使用代理
             proxy_file: 代理文件路径
             proxy_pool: 外部提供的代理池，如果为None则内部创建
+            session: 外部提供的HTTP会话，如果为None则每个工作线程各自创建挂载共享连接池的会话
         """
         self.base_url = base_url
         self.parser_name = parser_name
@@ -85,6 +297,20 @@ class ArticleSpider:
         self.incremental = incremental
         self.use_proxy = use_proxy
         
+        # HTTP会话（连接复用）：未指定时每个线程使用各自的会话，requests.Session不保证线程安全
+        self._session = session
+        self._thread_local = threading.local()
+        # 各线程创建的会话，爬取结束时统一关闭
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        
+        # 全局限速：每个线程平均每 delay 秒发出一个请求，由所有线程共享
+        if delay > 0:
+            self.rate_limiter = RateLimiter(rate=max(thread_count, 1) / delay,
+                                            capacity=max(thread_count, 1))
+        else:
+            self.rate_limiter = None
+        
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
         
@@ -93,10 +319,20 @@ class ArticleSpider:
         
         # 初始化队列和锁
         self.article_queue = queue.Queue(maxsize=queue_size)
+        self.url_queue = queue.Queue(maxsize=queue_size)
         self.visited_urls: Set[str] = set()
+        self.queued_urls: Set[str] = set()
         self.articles: List[Dict[str, Any]] = []
+        self.articles_lock = threading.Lock()
+        self.article_count = 0
         self.lock = threading.RLock()
         
+        # 解析结果缓存：HTML内容哈希 -> 文章信息，相同页面内容不重复解析
+        self.parse_cache: Dict[str, Dict[str, Any]] = {}
+        
+        # 每爬取到一篇文章时的回调，由 crawl() 设置
+        self.on_article: Optional[Callable[[Dict[str, Any]], None]] = None
+        
         # 爬取状态
         self.is_running = False
         self.has_error = False
@@ -120,20 +356,6 @@ class ArticleSpider:
         
         logger.info(f"爬虫初始化完成: {base_url}, 线程数: {thread_count}, "
                    f"最大文章数: {max_articles}, 使用代理: {use_proxy}")
-        
-        # 创建输出目录
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # 已访问URL集合
-        self.visited_urls = set()
-        
-        # 初始化文章列表和线程安全锁
-        self.articles = []
-        self.articles_lock = threading.Lock()
-        self.article_count = 0
-        
-        # 初始化URL队列
-        self.url_queue = queue.Queue(maxsize=queue_size)
     
     def get_random_headers(self) -> Dict[str, str]:
         """
@@ -142,14 +364,44 @@ class ArticleSpider:
         Returns:
             包含随机User-Agent的请求头字典
         """
-        return {
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-    
+        return {**_BASE_HEADERS, 'User-Agent': random.choice(_UA_POOL)}
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        当前线程使用的HTTP会话
+
+        Returns:
+            外部提供的会话，或当前线程首次请求时创建的会话
+        """
+        if self._session is not None:
+            return self._session
+
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = create_session()
+            self._thread_local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """
+        关闭本爬虫各线程创建的HTTP会话，释放连接池中的空闲连接
+
+        外部提供的会话由调用方负责关闭；关闭后再次请求时会重新创建会话
+        """
+        with self._sessions_lock:
+            sessions = self._sessions
+            self._sessions = []
+            self._thread_local = threading.local()
+
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                logger.debug(f"关闭HTTP会话失败: {e}")
+
     def get_page(self, url: str) -> Optional[str]:
         """
         获取页面内容
@@ -160,13 +412,13 @@ class ArticleSpider:
         Returns:
             页面HTML内容，失败则返回None
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        }
-        
         retries = 0
         
         while retries < self.max_retries:
+            # 等待限速器放行，控制所有线程的总请求速率
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            
             try:
                 # 是否使用代理
                 proxy = None
@@ -183,9 +435,9 @@ class ArticleSpider:
                 
                 # 发送请求
                 start_time = time.time()
-                response = requests.get(
+                response = self.session.get(
                     url, 
-                    headers=headers, 
+                    headers=_PAGE_HEADERS, 
                     timeout=self.timeout,
                     proxies=proxies
                 )
@@ -200,6 +452,15 @@ class ArticleSpider:
                 if response.status_code == 200:
                     logger.debug(f"获取页面成功: {url}, 代理: {proxy.url if proxy else '无'}")
                     return response.text
+                elif response.status_code in (429, 503):
+                    # 服务器限流：按 Retry-After 指定的时间等待后重试，不叠加指数退避
+                    retries += 1
+                    wait_time = _parse_retry_after(response.headers.get('Retry-After'), self.delay)
+                    logger.warning(f"请求被限流: {url}, 状态码: {response.status_code}, "
+                                   f"{wait_time:.1f} 秒后重试")
+                    
+                    if retries < self.max_retries:
+                        time.sleep(wait_time)
                 else:
                     logger.warning(f"获取页面失败: {url}, 状态码: {response.status_code}")
                     retries += 1
@@ -276,8 +537,9 @@ class ArticleSpider:
         # 从文件加载已访问URL
         if os.path.exists(visited_file):
             try:
-                with open(visited_file, 'r', encoding='utf-8') as f:
-                    self.visited_urls = set(json.load(f))
+                with open(visited_file, 'rb') as f:
+                    data = f.read()
+                self.visited_urls = set(orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data))
                 logger.info(f"从记录中加载 {len(self.visited_urls)} 个已访问URL")
             except Exception as e:
                 logger.warning(f"加载已访问URL失败: {e}")
@@ -285,6 +547,9 @@ class ArticleSpider:
         # 从CSV文件中提取URL（兼容旧数据）
         if os.path.exists(csv_file) and not self.visited_urls:
             try:
+                # pandas导入较慢，仅在需要读取旧数据时加载
+                import pandas as pd
+                
                 df = pd.read_csv(csv_file)
                 if 'url' in df.columns:
                     urls = df['url'].dropna().unique().tolist()
@@ -301,12 +566,22 @@ class ArticleSpider:
         # 已爬取文章的记录文件
         visited_file = os.path.join(self.output_dir, 'visited_urls.json')
         
+        # 先写临时文件再原子替换，中途崩溃不会留下半截的JSON
+        tmp_file = visited_file + '.tmp'
+        
         try:
-            with open(visited_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.visited_urls), f)
+            if ORJSON_AVAILABLE:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(list(self.visited_urls)))
+            else:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(list(self.visited_urls), f)
+            os.replace(tmp_file, visited_file)
             logger.info(f"已保存 {len(self.visited_urls)} 个已访问URL")
         except Exception as e:
             logger.error(f"保存已访问URL失败: {e}")
+            # 删除写了一半的临时文件，已有记录保持不变
+            _remove_file(tmp_file)
     
     def load_existing_articles(self) -> None:
         """
@@ -320,6 +595,8 @@ class ArticleSpider:
             return
         
         try:
+            import pandas as pd
+            
             df = pd.read_csv(csv_file)
             articles = df.to_dict('records')
             
@@ -342,6 +619,38 @@ class ArticleSpider:
         """
         return hashlib.md5(url.encode('utf-8')).hexdigest()
     
+    def parse_article(self, html: str, url: str) -> Optional[Dict[str, Any]]:
+        """
+        解析文章页面，内容相同的页面直接复用缓存的解析结果
+        
+        Args:
+            html: 文章页面HTML
+            url: 文章URL
+            
+        Returns:
+            文章信息字典，解析失败则返回None
+        """
+        content_hash = hashlib.md5(html.encode('utf-8')).hexdigest()
+        
+        with self.lock:
+            cached = self.parse_cache.get(content_hash)
+        if cached is not None:
+            logger.debug(f"页面内容与已解析页面相同，复用解析结果: {url}")
+            article = copy.deepcopy(cached)
+            article['url'] = url
+            return article
+        
+        article = self.parser.parse_article(html, url)
+        if article:
+            with self.lock:
+                # 超出容量时淘汰最早加入的条目
+                if len(self.parse_cache) >= self.PARSE_CACHE_SIZE:
+                    self.parse_cache.pop(next(iter(self.parse_cache)))
+                # 缓存副本，调用方修改返回值（包括其中的列表字段）不影响缓存
+                self.parse_cache[content_hash] = copy.deepcopy(article)
+        
+        return article
+    
     def crawl_article_worker(self) -> None:
         """
         爬取文章的工作线程
@@ -375,7 +684,7 @@ class ArticleSpider:
                 
                 # 解析文章
                 try:
-                    article_data = self.parser.parse_article(article_html, url)
+                    article_data = self.parse_article(article_html, url)
                     if not article_data:
                         logger.warning(f"解析文章失败: {url}")
                         self.url_queue.task_done()
@@ -395,6 +704,7 @@ class ArticleSpider:
                     
                     # 记录进度
                     logger.info(f"已爬取 {article_count} 篇文章，最新: {article_data.get('title', '无标题')}")
+                    self._notify_article(article_data)
                     
                     # 定期保存数据
                     if article_count % 10 == 0:
@@ -403,12 +713,9 @@ class ArticleSpider:
                 except Exception as e:
                     logger.error(f"解析文章时发生错误: {url}, {str(e)}")
                 
-                # 标记任务完成
+                # 标记任务完成（请求间隔由 get_page 中的限速器控制）
                 self.url_queue.task_done()
                 
-                # 延迟避免请求过快
-                time.sleep(self.delay)
-                
             except queue.Empty:
                 # 队列为空，检查是否需要退出
                 logger.debug("文章队列为空，工作线程等待...")
@@ -451,11 +758,10 @@ class ArticleSpider:
             # 使用解析器提取文章链接
             raw_urls = self.parser.extract_article_links(html, list_url)
             
-            # 规范化URL
-            normalized_urls = []
+            # 规范化、过滤并去重，一次遍历完成并保持页面中的出现顺序
             for url in raw_urls:
                 normalized_url = self.normalize_url(url)
-                if not normalized_url:
+                if not normalized_url or normalized_url in self.queued_urls:
                     continue
                 
                 # 只保留同域名的URL
@@ -467,20 +773,9 @@ class ArticleSpider:
                     logger.debug(f"跳过已访问的URL: {normalized_url}")
                     continue
                 
-                normalized_urls.append(normalized_url)
-            
-            # 添加到队列
-            for url in normalized_urls:
-                try:
-                    # 标记为已访问
-                    self.visited_urls.add(url)
-                    
-                    # 添加到队列
-                    self.url_queue.put(url, block=False)
-                    article_urls.append(url)
-                except queue.Full:
-                    logger.warning("文章队列已满，停止添加")
-                    break
+                # 记录已收集的URL，同一页面或后续列表页中重复出现时直接跳过
+                self.queued_urls.add(normalized_url)
+                article_urls.append(normalized_url)
             
             logger.info(f"从列表页 {list_url} 收集到 {len(article_urls)} 个文章链接")
             
@@ -539,20 +834,28 @@ class ArticleSpider:
                 logger.info(f"已收集足够的文章URL: {self.url_queue.qsize()}")
                 break
             
-            # 增加页码和计数
+            # 增加页码和计数（请求间隔由 get_page 中的限速器控制）
             page_num += 1
             list_pages_crawled += 1
-            
-            # 延迟，避免被反爬
-            time.sleep(self.delay)
     
-    def crawl(self) -> List[Dict[str, Any]]:
+    def crawl(self, on_article: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
         """
         爬取文章
         
+        Args:
+            on_article: 每爬取到一篇新文章时调用的回调，可用于在爬取的同时开始处理文章；
+                回调在爬虫线程中执行，应尽快返回
+        
         Returns:
             爬取到的文章列表
         """
+        self.on_article = on_article
+        
+        # 增量模式下已有文章数达到上限时直接返回，不发起任何请求
+        if self.incremental and len(self.articles) >= self.max_articles:
+            logger.info(f"已有 {len(self.articles)} 篇文章，达到最大文章数 {self.max_articles}，跳过爬取")
+            return self.articles
+        
         try:
             self.is_running = True
             
@@ -581,6 +884,9 @@ class ArticleSpider:
             # 如果使用了代理池，保存代理
             if self.use_proxy and self.proxy_pool:
                 self.proxy_pool.save_proxies()
+            
+            # 关闭各线程创建的HTTP会话
+            self.close()
     
     def crawl_single_thread(self) -> List[Dict[str, Any]]:
         """
@@ -645,9 +951,6 @@ class ArticleSpider:
             # 提交爬取任务
             future_to_url = {}
             for url in article_urls:
-                # 使用随机延迟避免被反爬
-                time.sleep(self.delay * random.random())
-                
                 future = executor.submit(self._crawl_article, url)
                 future_to_url[future] = url
             
@@ -660,19 +963,35 @@ class ArticleSpider:
                         with self.articles_lock:
                             self.articles.append(article)
                             self.article_count += 1
+                            self.visited_urls.add(url)
                             
                             if self.article_count % 10 == 0:
                                 self.save_to_csv()
                                 logger.info(f"已获取 {self.article_count}/{self.max_articles} 篇文章")
+                        self._notify_article(article)
                 except Exception as e:
                     logger.error(f"处理文章 {url} 时发生错误: {e}")
         
-        # 完成后保存一次
-        self.save_to_csv()
+        # 最终结果由 crawl() 的 finally 统一保存，这里不再重复写入
         
         logger.info(f"爬取完成，共获取 {len(self.articles)} 篇文章，耗时 {time.time() - start_time:.2f} 秒")
         return self.articles
     
+    def _notify_article(self, article: Dict[str, Any]) -> None:
+        """
+        将新爬取的文章交给回调处理，回调出错不影响爬取
+        
+        Args:
+            article: 文章信息字典
+        """
+        if self.on_article is None:
+            return
+        
+        try:
+            self.on_article(article)
+        except Exception as e:
+            logger.error(f"文章回调处理失败: {e}")
+    
     def _crawl_article(self, url: str) -> Optional[Dict[str, Any]]:
         """
         爬取单个文章(用于线程池)
@@ -689,7 +1008,7 @@ class ArticleSpider:
             return None
         
         # 解析文章
-        article = self.parser.parse_article(article_html, url)
+        article = self.parse_article(article_html, url)
         return article
     
     def save_to_csv(self) -> None:
@@ -702,9 +1021,11 @@ class ArticleSpider:
         csv_file = os.path.join(self.output_dir, 'articles.csv')
         
         try:
-            df = pd.DataFrame(self.articles)
-            df.to_csv(csv_file, index=False, encoding='utf-8')
-            logger.info(f"已将 {len(self.articles)} 篇文章保存到 {csv_file}")
+            # 取快照，避免写入过程中其他线程追加文章
+            articles = list(self.articles)
+            write_articles_csv(articles, csv_file)
+            
+            logger.info(f"已将 {len(articles)} 篇文章保存到 {csv_file}")
         except Exception as e:
             logger.error(f"保存文章数据失败: {e}")
 
@@ -138,9 +138,7 @@ def test_spider(config: Dict[str, Any], max_articles: int = 5) -> List[Dict[str,
         
         return articles
     except Exception as e:
-        logger.error(f"爬取文章失败: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"爬取文章失败: {e}")
         return []
 
 
@@ -233,9 +231,7 @@ def test_nlp(config: Dict[str, Any], articles: List[Dict[str, Any]]) -> List[Dic
         
         return articles
     except Exception as e:
-        logger.error(f"NLP处理失败: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"NLP处理失败: {e}")
         return articles
 
 
@@ -304,9 +300,7 @@ def test_visualization(config: Dict[str, Any]) -> bool:
         logger.info("可视化功能测试完成")
         return True
     except Exception as e:
-        logger.error(f"可视化测试失败: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"可视化测试失败: {e}")
         return False
 
 
@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试文章爬虫
+
+使用模拟的页面和解析器测试ArticleSpider，不发起网络请求
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import spider.spider as spider_module
+from spider.spider import ArticleSpider, MAX_RETRY_AFTER, _parse_retry_after, write_articles_csv
+
+BASE_URL = 'https://example.com'
+
+
+class NoWaitQueue(queue.Queue):
+    """取不到URL时立即抛出queue.Empty，工作线程无需等待超时即可退出"""
+    
+    def get(self, block=True, timeout=None):
+        return super().get(block=False)
+
+
+def make_spider(output_dir, **kwargs):
+    """创建使用模拟页面和解析器的爬虫，列表页包含3篇文章"""
+    options = dict(base_url=BASE_URL, delay=0, max_articles=10, output_dir=output_dir,
+                   thread_count=1, max_retries=1)
+    options.update(kwargs)
+    article_spider = ArticleSpider(**options)
+    
+    article_spider.get_page = mock.MagicMock(side_effect=lambda url: f'<html>{url}</html>')
+    article_spider.parser = mock.MagicMock()
+    article_spider.parser.extract_article_links.side_effect = (
+        lambda html, url: ['/article/1', '/article/2', '/article/3'] if url == BASE_URL else [])
+    article_spider.parser.parse_article.side_effect = (
+        lambda html, url: {'title': url.rsplit('/', 1)[-1], 'content': f'文章{url}'})
+    article_spider.url_queue = NoWaitQueue(maxsize=article_spider.queue_size)
+    return article_spider
+
+
+def patch_sleep():
+    """替换爬虫模块中的time，sleep不实际等待，可通过返回对象的sleep检查调用"""
+    fake_time = mock.MagicMock(wraps=time)
+    fake_time.sleep = mock.MagicMock()
+    return mock.patch.object(spider_module, 'time', fake_time)
+
+
+def run_crawl(article_spider, on_article=None):
+    """执行爬取，跳过爬虫中的等待"""
+    with patch_sleep():
+        return article_spider.crawl(on_article=on_article)
+
+
+def make_response(status_code, text='', headers=None):
+    """创建模拟的HTTP响应"""
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+
+class TestCrawlCallback(unittest.TestCase):
+    """测试爬取过程中的文章回调"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.spider = make_spider(self.test_dir)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_on_article(self):
+        """测试每爬取到一篇文章调用一次回调"""
+        received = []
+        articles = run_crawl(self.spider, received.append)
+        
+        self.assertEqual(len(articles), 3)
+        self.assertEqual([article['url'] for article in received],
+                         [f'{BASE_URL}/article/{i}' for i in (1, 2, 3)])
+    
+    def test_on_article_error(self):
+        """测试回调出错不影响爬取，后续文章仍会回调"""
+        received = []
+        
+        def on_article(article):
+            received.append(article['title'])
+            if article['title'] == '1':
+                raise RuntimeError('回调失败')
+        
+        articles = run_crawl(self.spider, on_article)
+        
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(received, ['1', '2', '3'])
+        self.assertFalse(self.spider.has_error)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'articles.csv')))
+
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    """测试Retry-After响应头解析"""
+    
+    def test_delta_seconds(self):
+        """测试秒数格式"""
+        self.assertEqual(_parse_retry_after('5', 1.0), 5.0)
+        self.assertEqual(_parse_retry_after('2.5', 1.0), 2.5)
+    
+    def test_http_date(self):
+        """测试HTTP日期格式"""
+        retry_time = datetime.now(timezone.utc) + timedelta(seconds=30)
+        wait_time = _parse_retry_after(format_datetime(retry_time, usegmt=True), 1.0)
+        self.assertAlmostEqual(wait_time, 30, delta=2)
+    
+    def test_past_date(self):
+        """测试已过去的日期和负数不需要等待"""
+        retry_time = datetime.now(timezone.utc) - timedelta(minutes=5)
+        self.assertEqual(_parse_retry_after(format_datetime(retry_time, usegmt=True), 1.0), 0.0)
+        self.assertEqual(_parse_retry_after('-5', 1.0), 0.0)
+    
+    def test_invalid_or_missing(self):
+        """测试无法解析或缺失时使用默认等待时间"""
+        self.assertEqual(_parse_retry_after('soon', 1.5), 1.5)
+        self.assertEqual(_parse_retry_after('', 1.5), 1.5)
+        self.assertEqual(_parse_retry_after(None, 1.5), 1.5)
+    
+    def test_max_retry_after(self):
+        """测试等待时间不超过MAX_RETRY_AFTER"""
+        self.assertEqual(_parse_retry_after(str(MAX_RETRY_AFTER * 10), 1.0), MAX_RETRY_AFTER)
+        retry_time = datetime.now(timezone.utc) + timedelta(hours=1)
+        self.assertEqual(_parse_retry_after(format_datetime(retry_time, usegmt=True), 1.0),
+                         MAX_RETRY_AFTER)
+
+
+class TestGetPage(unittest.TestCase):
+    """测试页面获取和限流重试"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.session = mock.MagicMock()
+        self.spider = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir,
+                                    max_retries=3, session=self.session)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_retry_after_then_success(self):
+        """测试被限流后按Retry-After等待再重试"""
+        self.session.get.side_effect = [
+            make_response(429, headers={'Retry-After': '7'}),
+            make_response(200, text='<html>正文</html>'),
+        ]
+        with patch_sleep():
+            html = self.spider.get_page(f'{BASE_URL}/article/1')
+            spider_module.time.sleep.assert_called_once_with(7.0)
+        
+        self.assertEqual(html, '<html>正文</html>')
+        self.assertEqual(self.session.get.call_count, 2)
+    
+    def test_missing_retry_after_uses_delay(self):
+        """测试没有Retry-After时按delay等待"""
+        self.spider.delay = 0.5
+        self.session.get.side_effect = [make_response(503), make_response(200, text='ok')]
+        with patch_sleep():
+            self.assertEqual(self.spider.get_page(f'{BASE_URL}/article/1'), 'ok')
+            spider_module.time.sleep.assert_called_once_with(0.5)
+    
+    def test_no_sleep_after_last_attempt(self):
+        """测试最后一次尝试仍被限流时不再等待，直接返回None"""
+        self.session.get.return_value = make_response(429, headers={'Retry-After': '7'})
+        with patch_sleep():
+            self.assertIsNone(self.spider.get_page(f'{BASE_URL}/article/1'))
+            self.assertEqual(spider_module.time.sleep.call_count, 2)
+        
+        self.assertEqual(self.session.get.call_count, 3)
+
+
+
+class TestParseCache(unittest.TestCase):
+    """测试页面解析结果缓存"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.spider = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir)
+        self.spider.parser = mock.MagicMock()
+        self.spider.parser.parse_article.side_effect = (
+            lambda html, url: {'title': '标题', 'url': url, 'tags': ['新闻']})
+        self.html = '<html>相同的页面</html>'
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_hit_returns_copy_with_new_url(self):
+        """测试内容相同的页面复用解析结果，并带上新的URL"""
+        first = self.spider.parse_article(self.html, f'{BASE_URL}/a')
+        second = self.spider.parse_article(self.html, f'{BASE_URL}/b')
+        
+        self.assertEqual(self.spider.parser.parse_article.call_count, 1)
+        self.assertEqual(first['url'], f'{BASE_URL}/a')
+        self.assertEqual(second['url'], f'{BASE_URL}/b')
+        self.assertEqual(second['title'], '标题')
+        self.assertIsNot(first, second)
+    
+    def test_modify_result_keeps_cache(self):
+        """测试修改返回的文章不影响缓存"""
+        first = self.spider.parse_article(self.html, f'{BASE_URL}/a')
+        first['title'] = '修改后的标题'
+        first['tags'].append('修改')
+        first['crawl_time'] = '2024-01-01 00:00:00'
+        
+        second = self.spider.parse_article(self.html, f'{BASE_URL}/b')
+        second['tags'].append('再次修改')
+        third = self.spider.parse_article(self.html, f'{BASE_URL}/c')
+        
+        self.assertEqual(third, {'title': '标题', 'url': f'{BASE_URL}/c', 'tags': ['新闻']})
+    
+    def test_failed_parse_not_cached(self):
+        """测试解析失败的页面不放入缓存"""
+        self.spider.parser.parse_article.side_effect = None
+        self.spider.parser.parse_article.return_value = None
+        
+        self.assertIsNone(self.spider.parse_article(self.html, f'{BASE_URL}/a'))
+        self.assertIsNone(self.spider.parse_article(self.html, f'{BASE_URL}/b'))
+        self.assertEqual(self.spider.parser.parse_article.call_count, 2)
+        self.assertEqual(len(self.spider.parse_cache), 0)
+    
+    def test_eviction(self):
+        """测试超过PARSE_CACHE_SIZE时淘汰最早加入的条目"""
+        self.spider.PARSE_CACHE_SIZE = 2
+        for i in range(3):
+            self.spider.parse_article(f'<html>{i}</html>', f'{BASE_URL}/{i}')
+        self.assertEqual(len(self.spider.parse_cache), 2)
+        
+        # 最早的页面已被淘汰，需要重新解析；较新的页面仍命中缓存
+        self.spider.parse_article('<html>2</html>', f'{BASE_URL}/2')
+        self.assertEqual(self.spider.parser.parse_article.call_count, 3)
+        self.spider.parse_article('<html>0</html>', f'{BASE_URL}/0')
+        self.assertEqual(self.spider.parser.parse_article.call_count, 4)
+
+
+
+class TestWriteArticlesCSV(unittest.TestCase):
+    """测试逐行写入文章CSV"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_file = os.path.join(self.test_dir, 'articles.csv')
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def read_rows(self):
+        """读取CSV文件的表头和各行"""
+        with open(self.csv_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            return reader.fieldnames, list(reader)
+    
+    def test_values(self):
+        """测试NaN和None写为空字符串，列表和字典写为JSON"""
+        write_articles_csv([{
+            'title': '标题',
+            'summary': float('nan'),
+            'author': None,
+            'tags': ['新闻', '科技'],
+            'meta': {'来源': '新华社'},
+            'views': 10,
+        }], self.csv_file)
+        
+        _, rows = self.read_rows()
+        row = rows[0]
+        self.assertEqual(row['summary'], '')
+        self.assertEqual(row['author'], '')
+        self.assertEqual(json.loads(row['tags']), ['新闻', '科技'])
+        self.assertEqual(json.loads(row['meta']), {'来源': '新华社'})
+        self.assertEqual(row['views'], '10')
+    
+    def test_fieldnames_union(self):
+        """测试表头为所有文章字段的并集，按首次出现的顺序排列"""
+        write_articles_csv([
+            {'title': 'a', 'url': 'u1'},
+            {'url': 'u2', 'content': '正文'},
+            {'author': '作者'},
+        ], self.csv_file)
+        
+        fieldnames, rows = self.read_rows()
+        self.assertEqual(fieldnames, ['title', 'url', 'content', 'author'])
+        self.assertEqual(rows[1], {'title': '', 'url': 'u2', 'content': '正文', 'author': ''})
+    
+    def test_failed_write_removes_tmp(self):
+        """测试写入失败时删除临时文件，已有文件保持不变"""
+        write_articles_csv([{'title': 'old'}], self.csv_file)
+        
+        with self.assertRaises(UnicodeEncodeError):
+            write_articles_csv([{'title': '中文标题'}], self.csv_file, encoding='ascii')
+        
+        self.assertFalse(os.path.exists(self.csv_file + '.tmp'))
+        _, rows = self.read_rows()
+        self.assertEqual(rows, [{'title': 'old'}])
+
+
+
+class TestSaveVisitedUrls(unittest.TestCase):
+    """测试保存已访问URL记录"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.spider = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir)
+        self.visited_file = os.path.join(self.test_dir, 'visited_urls.json')
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_save_and_load(self):
+        """测试保存后可重新加载，且不留下临时文件"""
+        self.spider.visited_urls = {f'{BASE_URL}/a', f'{BASE_URL}/b'}
+        self.spider.save_visited_urls()
+        self.assertFalse(os.path.exists(self.visited_file + '.tmp'))
+        
+        loaded = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir, incremental=True)
+        self.assertEqual(loaded.visited_urls, {f'{BASE_URL}/a', f'{BASE_URL}/b'})
+    
+    def test_failed_save_removes_tmp(self):
+        """测试序列化失败时删除临时文件，已有记录保持不变"""
+        self.spider.visited_urls = {f'{BASE_URL}/a'}
+        self.spider.save_visited_urls()
+        
+        # 无法序列化的内容写入失败
+        self.spider.visited_urls = {object()}
+        self.spider.save_visited_urls()
+        
+        self.assertFalse(os.path.exists(self.visited_file + '.tmp'))
+        with open(self.visited_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [f'{BASE_URL}/a'])
+
+
+
+class TestSessions(unittest.TestCase):
+    """测试各线程的HTTP会话"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def get_thread_sessions(self, article_spider, thread_count=2):
+        """在多个线程中获取会话，返回各线程得到的会话"""
+        sessions = []
+        
+        def worker():
+            # 同一线程多次获取的是同一个会话
+            session = article_spider.session
+            self.assertIs(article_spider.session, session)
+            sessions.append(session)
+        
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sessions
+    
+    def test_session_per_thread(self):
+        """测试每个线程使用各自的会话，并共享连接池适配器"""
+        article_spider = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir)
+        first, second = self.get_thread_sessions(article_spider)
+        
+        self.assertIsNot(first, second)
+        self.assertIs(first.get_adapter(BASE_URL), second.get_adapter(BASE_URL))
+    
+    def test_close(self):
+        """测试close关闭各线程创建的会话，之后重新创建会话"""
+        article_spider = ArticleSpider(base_url=BASE_URL, delay=0, output_dir=self.test_dir)
+        sessions = self.get_thread_sessions(article_spider)
+        main_session = article_spider.session
+        
+        with mock.patch.object(spider_module.requests.Session, 'close', autospec=True) as close:
+            article_spider.close()
+            closed = [call.args[0] for call in close.call_args_list]
+        
+        self.assertEqual(len(closed), 3)
+        for session in sessions + [main_session]:
+            self.assertTrue(any(session is other for other in closed))
+        self.assertIsNot(article_spider.session, main_session)
+    
+    def test_crawl_closes_sessions(self):
+        """测试爬取结束后关闭爬取过程中创建的会话"""
+        article_spider = make_spider(self.test_dir)
+        used = []
+        article_spider.get_page.side_effect = (
+            lambda url: used.append(article_spider.session) or f'<html>{url}</html>')
+        
+        with mock.patch.object(spider_module.requests.Session, 'close', autospec=True) as close:
+            run_crawl(article_spider)
+        
+        self.assertTrue(used)
+        close.assert_called_once_with(used[0])
+    
+    def test_external_session_not_closed(self):
+        """测试外部提供的会话不由爬虫关闭"""
+        session = mock.MagicMock()
+        article_spider = make_spider(self.test_dir, session=session)
+        run_crawl(article_spider)
+        
+        self.assertIs(article_spider.session, session)
+        session.close.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
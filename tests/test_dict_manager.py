@@ -125,6 +125,23 @@ class TestDictManager(unittest.TestCase):
         self.assertFalse(self.dict_manager.remove_word(""))
         self.assertFalse(self.dict_manager.remove_word(None))
     
+    def test_word_category_index(self):
+        """测试词语类别索引与类别集合保持一致"""
+        self.dict_manager.add_word("北京", "ns", 200, "place")
+        self.assertEqual(self.dict_manager.word_category["北京"], 'place')
+        
+        # 更换类别后只存在于新类别中
+        self.dict_manager.add_word("北京", "ns", 200, "organization")
+        self.assertEqual(self.dict_manager.word_category["北京"], 'organization')
+        self.assertNotIn("北京", self.dict_manager.dict_categories['place'])
+        self.assertIn("北京", self.dict_manager.dict_categories['organization'])
+        
+        # 删除后索引和类别集合中都不存在
+        self.assertTrue(self.dict_manager.remove_word("北京"))
+        self.assertNotIn("北京", self.dict_manager.word_category)
+        self.assertNotIn("北京", self.dict_manager.dict_categories['organization'])
+        self.assertFalse(self.dict_manager.remove_word("北京"))
+    
     def test_get_words_by_category(self):
         """测试获取指定类别的词语"""
         # 添加测试词语
@@ -148,6 +165,26 @@ class TestDictManager(unittest.TestCase):
         invalid_words = self.dict_manager.get_words_by_category("invalid")
         self.assertEqual(len(invalid_words), 0)
     
+    def test_sorted_words_cache_invalidation(self):
+        """测试词语增删后排序结果随之更新"""
+        self.dict_manager.add_word("乙", category="custom")
+        self.assertEqual(self.dict_manager.get_words_by_category('custom'), ["乙"])
+        
+        self.dict_manager.add_word("甲", category="custom")
+        self.assertEqual(self.dict_manager.get_words_by_category('custom'), ["乙", "甲"])
+        
+        # 移动到其他类别后两个类别都需更新
+        self.dict_manager.add_word("甲", category="place")
+        self.assertEqual(self.dict_manager.get_words_by_category('custom'), ["乙"])
+        self.assertEqual(self.dict_manager.get_words_by_category('place'), ["甲"])
+        
+        self.dict_manager.remove_word("乙")
+        self.assertEqual(self.dict_manager.get_words_by_category('custom'), [])
+        
+        # 修改返回的列表不影响词典
+        self.dict_manager.get_words_by_category('place').append("丙")
+        self.assertEqual(self.dict_manager.get_words_by_category('place'), ["甲"])
+    
     def test_get_all_words(self):
         """测试获取所有词语"""
         # 添加测试词语
@@ -190,6 +227,28 @@ class TestDictManager(unittest.TestCase):
         self.assertEqual(new_dict_manager.word_attrs["北京"], {'pos': 'ns', 'freq': 200})
         self.assertEqual(new_dict_manager.word_attrs["清华大学"], {'pos': 'ni', 'freq': 300})
     
+    def test_load_dict_attrs(self):
+        """测试加载词典时解析任意顺序的属性"""
+        with open(self.dict_manager.user_dict_path, 'w', encoding='utf-8') as f:
+            f.write("# 自定义词典\n")
+            f.write("自然语言处理 freq=1000 pos=nl category=industry\n")
+            f.write("北京\tcategory=place pos=ns freq=abc\n")
+            f.write("张三 category=unknown\n")
+        
+        new_dict_manager = DictManager(dict_dir=self.test_dir)
+        
+        # 属性顺序不影响解析
+        self.assertIn("自然语言处理", new_dict_manager.dict_categories['industry'])
+        self.assertEqual(new_dict_manager.word_attrs["自然语言处理"], {'pos': 'nl', 'freq': 1000})
+        
+        # 无效词频使用默认值
+        self.assertIn("北京", new_dict_manager.dict_categories['place'])
+        self.assertEqual(new_dict_manager.word_attrs["北京"], {'pos': 'ns', 'freq': 100})
+        
+        # 无效类别归入custom
+        self.assertIn("张三", new_dict_manager.dict_categories['custom'])
+        self.assertEqual(new_dict_manager.word_attrs["张三"], {'pos': 'n', 'freq': 100})
+    
     def test_export_jieba_dict(self):
         """测试导出jieba词典"""
         # 添加测试词语
@@ -277,6 +336,20 @@ class TestDictManager(unittest.TestCase):
         # 为不支持的分词器构建词典
         invalid_dict_path = self.dict_manager.build_custom_dict_for_segmenter('invalid')
         self.assertEqual(invalid_dict_path, "")
+    
+    def test_export_after_attr_change(self):
+        """测试修改词语属性后重新导出的词典内容随之更新"""
+        self.dict_manager.add_word("测试词语", "n", 100, "custom")
+        jieba_dict_path = self.dict_manager.export_jieba_dict()
+        
+        # 类别不变，只修改词性和词频
+        self.dict_manager.add_word("测试词语", "v", 300, "custom")
+        hanlp_dict_path = self.dict_manager.build_custom_dict_for_segmenter('hanlp')
+        
+        with open(jieba_dict_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "测试词语 100 n\n")
+        with open(hanlp_dict_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "测试词语 300 v\n")
 
 
 if __name__ == "__main__":
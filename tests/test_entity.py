@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试实体提取模块
+
+测试实体提取器基类的结果缓存和简单规则实体提取器
+"""
+
+import unittest
+from unittest import mock
+from nlp.entity import SimpleRuleEntityExtractor
+
+class TestEntityCache(unittest.TestCase):
+    """测试实体提取结果缓存"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.extractor = SimpleRuleEntityExtractor()
+        self.text = '马云在杭州创办了阿里巴巴。'
+    
+    def test_cache_hit(self):
+        """测试相同文本只提取一次"""
+        with mock.patch.object(self.extractor, '_extract_uncached',
+                               wraps=self.extractor._extract_uncached) as extract:
+            first = self.extractor.extract_entities(self.text)
+            second = self.extractor.extract_entities(self.text)
+        
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first['PER'], ['马云'])
+        self.assertEqual(first['LOC'], ['杭州'])
+        self.assertEqual(first['ORG'], ['阿里巴巴'])
+    
+    def test_result_is_copy(self):
+        """测试修改返回结果不影响缓存"""
+        first = self.extractor.extract_entities(self.text)
+        first['PER'].append('修改')
+        first['LOC'] = []
+        
+        second = self.extractor.extract_entities(self.text)
+        second['ORG'].clear()
+        
+        third = self.extractor.extract_entities(self.text)
+        self.assertEqual(third, {'LOC': ['杭州'], 'PER': ['马云'], 'ORG': ['阿里巴巴']})
+    
+    def test_failure_not_cached(self):
+        """测试提取失败时返回空结果且不缓存，下次重新提取"""
+        entities = {'LOC': ['杭州'], 'PER': [], 'ORG': []}
+        with mock.patch.object(self.extractor, '_extract_uncached',
+                               side_effect=[RuntimeError('模型异常'), entities]) as extract:
+            self.assertEqual(self.extractor.extract_entities(self.text),
+                             {'LOC': [], 'PER': [], 'ORG': []})
+            self.assertEqual(len(self.extractor._cache), 0)
+            
+            self.assertEqual(self.extractor.extract_entities(self.text), entities)
+            self.assertEqual(self.extractor.extract_entities(self.text), entities)
+        
+        self.assertEqual(extract.call_count, 2)
+    
+    def test_empty_text(self):
+        """测试空文本返回各类别为空的结果，不调用提取"""
+        with mock.patch.object(self.extractor, '_extract_uncached') as extract:
+            self.assertEqual(self.extractor.extract_entities(''), {'LOC': [], 'PER': [], 'ORG': []})
+            self.assertEqual(self.extractor.extract_entities(None), {'LOC': [], 'PER': [], 'ORG': []})
+        extract.assert_not_called()
+    
+    def test_eviction(self):
+        """测试超过CACHE_SIZE时淘汰最久未使用的条目"""
+        self.extractor.CACHE_SIZE = 2
+        with mock.patch.object(self.extractor, '_extract_uncached',
+                               wraps=self.extractor._extract_uncached) as extract:
+            self.extractor.extract_entities('北京')
+            self.extractor.extract_entities('上海')
+            # 再次使用北京，上海变为最久未使用
+            self.extractor.extract_entities('北京')
+            self.extractor.extract_entities('广州')
+            self.assertEqual(len(self.extractor._cache), 2)
+            self.assertEqual(extract.call_count, 3)
+            
+            # 北京仍在缓存中，上海已被淘汰
+            self.extractor.extract_entities('北京')
+            self.assertEqual(extract.call_count, 3)
+            self.extractor.extract_entities('上海')
+            self.assertEqual(extract.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -187,15 +187,15 @@ class TestEntityOptimizer(unittest.TestCase):
         self.assertEqual(len(none_optimized["person"]), 2)  # 应包含自定义实体
     
     def test_merge_custom_entities(self):
-        """测试合并自定义实体"""
+        """测试优化时合并自定义实体"""
         # 准备测试数据
         entities = {
             'person': ['张三'],
             'organization': ['公司A']
         }
         
-        # 执行合并
-        merged = self.optimizer._merge_custom_entities(entities)
+        # 执行优化
+        merged = self.optimizer.optimize_entities(entities)
         
         # 检查结果
         self.assertIn('张三', merged['person'])
@@ -205,20 +205,20 @@ class TestEntityOptimizer(unittest.TestCase):
         self.assertIn('北京大学', merged['organization'])  # 自定义实体
     
     def test_merge_entities(self):
-        """测试合并两个实体字典"""
+        """测试优化时合并模型识别结果与规则识别结果"""
+        optimizer = EntityOptimizer(
+            custom_entities={'person': [], 'place': [], 'organization': []},
+            entity_rules={'person': [r'李四|王五'], 'place': [r'北京|上海']}
+        )
+        
         # 准备测试数据
-        entities1 = {
+        entities = {
             'person': ['张三', '李四'],
             'organization': ['公司A']
         }
         
-        entities2 = {
-            'person': ['李四', '王五'],
-            'place': ['北京', '上海']
-        }
-        
-        # 执行合并
-        merged = self.optimizer._merge_entities(entities1, entities2)
+        # 执行优化
+        merged = optimizer.optimize_entities(entities, '李四和王五在北京和上海见面')
         
         # 检查结果
         self.assertEqual(len(merged['person']), 3)  # 张三、李四、王五
@@ -234,7 +234,7 @@ class TestEntityOptimizer(unittest.TestCase):
         self.assertIn('上海', merged['place'])
     
     def test_filter_stop_entities(self):
-        """测试过滤停用实体"""
+        """测试优化时过滤停用实体"""
         # 准备测试数据
         entities = {
             'person': ['张三', '李四', '他', '她', '某某'],
@@ -242,8 +242,11 @@ class TestEntityOptimizer(unittest.TestCase):
             'organization': ['公司A', '本单位', '该单位']
         }
         
-        # 执行过滤
-        filtered = self.optimizer._filter_stop_entities(entities)
+        # 不含自定义实体的优化器，结果中只有输入实体
+        optimizer = EntityOptimizer(custom_entities={'person': [], 'place': [], 'organization': []})
+        
+        # 执行优化
+        filtered = optimizer.optimize_entities(entities)
         
         # 检查结果
         self.assertEqual(len(filtered['person']), 2)  # 张三、李四
@@ -251,14 +254,35 @@ class TestEntityOptimizer(unittest.TestCase):
         self.assertEqual(len(filtered['organization']), 1)  # 公司A
         
         # 检查具体实体
-        self.assertIn('张三', filtered['person'])
-        self.assertIn('李四', filtered['person'])
-        self.assertNotIn('他', filtered['person'])
-        self.assertNotIn('她', filtered['person'])
-        self.assertNotIn('某某', filtered['person'])
+        self.assertEqual(sorted(filtered['person']), ['张三', '李四'])
+        self.assertEqual(sorted(filtered['place']), ['上海', '北京'])
+        self.assertEqual(filtered['organization'], ['公司A'])
+    
+    def test_add_remove_stop_entity(self):
+        """测试增删停用实体后过滤结果随之更新"""
+        entities = {'person': ['张三', '李四']}
+        
+        # 先优化一次，构建停用实体集合缓存
+        self.assertIn('李四', self.optimizer.optimize_entities(entities)['person'])
+        
+        # 添加停用实体
+        self.assertTrue(self.optimizer.add_stop_entity('李四', 'person'))
+        self.assertFalse(self.optimizer.add_stop_entity('李四', 'person'))
+        self.assertNotIn('李四', self.optimizer.optimize_entities(entities)['person'])
+        
+        # 移除停用实体
+        self.assertTrue(self.optimizer.remove_stop_entity('李四', 'person'))
+        self.assertFalse(self.optimizer.remove_stop_entity('李四', 'person'))
+        self.assertIn('李四', self.optimizer.optimize_entities(entities)['person'])
+        
+        # 整体替换停用实体
+        self.optimizer.stop_entities = {'person': ['张三']}
+        optimized = self.optimizer.optimize_entities(entities)
+        self.assertNotIn('张三', optimized['person'])
+        self.assertIn('李四', optimized['person'])
     
     def test_process_aliases(self):
-        """测试处理实体别名"""
+        """测试优化时处理实体别名"""
         # 准备测试数据
         entities = {
             'person': ['张三', '小张', '李四', '王老师'],
@@ -269,8 +293,8 @@ class TestEntityOptimizer(unittest.TestCase):
         self.optimizer.add_entity_alias('小张', '张三')
         self.optimizer.add_entity_alias('北大', '北京大学')
         
-        # 执行别名处理
-        processed = self.optimizer._process_aliases(entities)
+        # 执行优化
+        processed = self.optimizer.optimize_entities(entities)
         
         # 检查结果
         self.assertIn('张三', processed['person'])
@@ -305,6 +329,27 @@ class TestEntityOptimizer(unittest.TestCase):
             clean_org = [org for org in result['organization'] if org in ['北京大学', '清华大学']]
             self.assertEqual(clean_org, ['北京大学', '清华大学'])
 
+    def test_deduplicate_and_sort_top_k(self):
+        """测试只保留前top_k个实体"""
+        entities = {'person': ['甲', '乙乙', '丙丙丙', '丁', '戊戊', '己', '庚', '辛']}
+
+        top = self.optimizer._deduplicate_and_sort(entities, top_k=2)['person']
+        full = self.optimizer._deduplicate_and_sort(entities)['person']
+        self.assertEqual(top, full[:2])
+        self.assertEqual(top, ['丙丙丙', '乙乙'])
+    
+    def test_negative_top_k(self):
+        """测试top_k为负数时抛出ValueError"""
+        entities = {'person': ['甲', '乙乙', '丙丙丙', '丁']}
+        
+        with self.assertRaises(ValueError):
+            self.optimizer._deduplicate_and_sort(entities, top_k=-1)
+        with self.assertRaises(ValueError):
+            self.optimizer.optimize_entities(entities, top_k=-1)
+        
+        # top_k为0时每个类别都为空
+        self.assertEqual(self.optimizer._deduplicate_and_sort(entities, top_k=0), {'person': []})
+
 
 class TestEntityMerger(unittest.TestCase):
     """测试实体合并器类"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试主程序
+
+测试文章批量分析及实体和关系提取结果缓存
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main
+from tests.test_article_spider import make_spider, run_crawl
+
+
+def fake_process_content(content):
+    """模拟实体和关系提取，结果中带上文章内容便于核对"""
+    return json.dumps({'content': content}, ensure_ascii=False), '[]'
+
+
+class InlineExecutor:
+    """在提交时直接执行任务的进程池替身"""
+    
+    def __init__(self, *args, **kwargs):
+        self.submitted = []
+        self.is_shutdown = False
+    
+    def submit(self, fn, *args):
+        self.submitted.append(args[0])
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def shutdown(self, wait=True):
+        self.is_shutdown = True
+
+
+class TestNLPCache(unittest.TestCase):
+    """测试实体和关系提取结果缓存"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, 'nlp_cache.json')
+        self.dict_dir = os.path.join(self.test_dir, 'dictionaries')
+        os.makedirs(self.dict_dir)
+        self.nlp_config = dict(main.DEFAULT_CONFIG['nlp'], extractor='simple', relation='simple')
+        self.contents = ['张三访问北京。', '李四会见王五。']
+        
+        # 词典目录指向临时目录，NLP处理器不实际创建
+        patchers = [
+            mock.patch.object(main, 'NLP_DICT_DIR', self.dict_dir),
+            mock.patch.object(main, '_init_nlp_worker'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def analyze(self, contents, nlp_config=None, side_effect=fake_process_content):
+        """分析文章内容，返回(分析结果, 实际提取的文章内容列表)"""
+        with mock.patch.object(main, '_process_content', side_effect=side_effect) as process:
+            columns = main.analyze_contents(contents, nlp_config or self.nlp_config,
+                                            cache_file=self.cache_file)
+        return columns, [call.args[0] for call in process.call_args_list]
+    
+    def load_cache(self):
+        """读取缓存文件"""
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def test_hit_and_miss(self):
+        """测试第二次运行命中缓存，只提取新内容"""
+        first, processed = self.analyze(self.contents)
+        self.assertEqual(processed, self.contents)
+        self.assertEqual(len(self.load_cache()), 2)
+        
+        # 内容相同，全部命中缓存，结果与第一次一致
+        second, processed = self.analyze(self.contents)
+        self.assertEqual(processed, [])
+        self.assertEqual(second['entities'], first['entities'])
+        self.assertEqual(second['triples'], first['triples'])
+        
+        # 只有新内容需要提取
+        _, processed = self.analyze(self.contents + ['王五签署协议。'])
+        self.assertEqual(processed, ['王五签署协议。'])
+        self.assertEqual(len(self.load_cache()), 3)
+    
+    def test_duplicate_content(self):
+        """测试同一次运行中内容相同的文章只提取一次"""
+        columns, processed = self.analyze(['张三访问北京。', '张三访问北京。'])
+        self.assertEqual(processed, ['张三访问北京。'])
+        self.assertEqual(columns['entities'][0], columns['entities'][1])
+    
+    def test_extractor_change_invalidates(self):
+        """测试更换提取器后不命中旧结果"""
+        self.analyze(self.contents)
+        
+        nlp_config = dict(self.nlp_config, relation='hanlp')
+        _, processed = self.analyze(self.contents, nlp_config)
+        self.assertEqual(processed, self.contents)
+    
+    def test_dictionary_change_invalidates(self):
+        """测试修改词典后不命中旧结果"""
+        dict_file = os.path.join(self.dict_dir, 'persons.txt')
+        with open(dict_file, 'w', encoding='utf-8') as f:
+            f.write('张三\n')
+        self.analyze(self.contents)
+        
+        with open(dict_file, 'a', encoding='utf-8') as f:
+            f.write('李四\n')
+        _, processed = self.analyze(self.contents)
+        self.assertEqual(processed, self.contents)
+    
+    def test_failure_not_cached(self):
+        """测试提取失败的结果不写入缓存，下次运行重新提取"""
+        def failing_process_content(content):
+            if content == self.contents[0]:
+                return None, '[]'
+            return fake_process_content(content)
+        
+        columns, _ = self.analyze(self.contents, side_effect=failing_process_content)
+        self.assertIsNone(columns['entities'][0])
+        self.assertEqual(len(self.load_cache()), 1)
+        
+        _, processed = self.analyze(self.contents)
+        self.assertEqual(processed, [self.contents[0]])
+    
+    def test_trim_to_max_entries(self):
+        """测试超过条目上限时淘汰最久未使用的条目"""
+        cache = {'a': ['1', '1'], 'b': ['2', '2'], 'c': ['3', '3']}
+        with mock.patch.object(main, 'NLP_CACHE_MAX_ENTRIES', 2):
+            main._save_nlp_cache(cache, self.cache_file, used_keys=['a'])
+        
+        self.assertEqual(list(self.load_cache()), ['c', 'a'])
+    
+    def test_atomic_write(self):
+        """测试保存后不留下临时文件，写入失败时已有缓存保持不变"""
+        main._save_nlp_cache({'a': ['1', '1']}, self.cache_file)
+        self.assertEqual(self.load_cache(), {'a': ['1', '1']})
+        self.assertFalse(os.path.exists(self.cache_file + '.tmp'))
+        
+        # 无法序列化的内容写入失败
+        main._save_nlp_cache({'b': [object(), None]}, self.cache_file)
+        self.assertEqual(self.load_cache(), {'a': ['1', '1']})
+        self.assertFalse(os.path.exists(self.cache_file + '.tmp'))
+
+
+
+class TestCrawlNLPPrefetcher(unittest.TestCase):
+    """测试爬取过程中提前提取实体和关系"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.test_dir, 'nlp_cache.json')
+        self.nlp_config = dict(main.DEFAULT_CONFIG['nlp'], extractor='simple', relation='simple',
+                               workers=2)
+        
+        patchers = [
+            mock.patch.object(main, 'NLP_DICT_DIR', os.path.join(self.test_dir, 'dictionaries')),
+            mock.patch.object(main, 'ProcessPoolExecutor', InlineExecutor),
+            mock.patch.object(main, '_init_nlp_worker'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_submit_skips_cached_and_seen(self):
+        """测试已缓存、已提交和空内容的文章不再提交"""
+        salt = main._nlp_cache_salt(self.nlp_config)
+        main._save_nlp_cache({main._content_key('已缓存的文章', salt): ['{}', '[]']}, self.cache_file)
+        
+        prefetcher = main._CrawlNLPPrefetcher(self.nlp_config, self.cache_file)
+        with mock.patch.object(main, '_process_content', side_effect=fake_process_content):
+            for content in ['已缓存的文章', '新文章', '新文章', '', None]:
+                prefetcher({'content': content})
+            prefetcher({'title': '没有内容'})
+        
+        self.assertEqual(prefetcher.executor.submitted, ['新文章'])
+    
+    def test_collect(self):
+        """测试收集结果后关闭进程池，执行失败的任务不在结果中"""
+        def process_content(content):
+            if content == '失败的文章':
+                raise RuntimeError('提取失败')
+            return fake_process_content(content)
+        
+        prefetcher = main._CrawlNLPPrefetcher(self.nlp_config, self.cache_file)
+        with mock.patch.object(main, '_process_content', side_effect=process_content):
+            prefetcher({'content': '新文章'})
+            prefetcher({'content': '失败的文章'})
+        results = prefetcher.collect()
+        
+        self.assertEqual(list(results.values()), [fake_process_content('新文章')])
+        self.assertTrue(prefetcher.executor.is_shutdown)
+    
+    def test_crawl_with_prefetcher(self):
+        """测试爬取时提前提取，分析时直接使用提前提取的结果并写入缓存"""
+        prefetcher = main._CrawlNLPPrefetcher(self.nlp_config, self.cache_file)
+        article_spider = make_spider(self.test_dir)
+        with mock.patch.object(main, '_process_content', side_effect=fake_process_content):
+            articles = run_crawl(article_spider, prefetcher)
+        precomputed = prefetcher.collect()
+        contents = [article['content'] for article in articles]
+        self.assertEqual(prefetcher.executor.submitted, contents)
+        
+        with mock.patch.object(main, '_process_content', side_effect=fake_process_content) as process:
+            columns = main.analyze_contents(contents, self.nlp_config, cache_file=self.cache_file,
+                                            precomputed=precomputed)
+        
+        process.assert_not_called()
+        self.assertEqual(columns['entities'], [fake_process_content(content)[0] for content in contents])
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(set(json.load(f)), set(precomputed))
+
+
+if __name__ == '__main__':
+    unittest.main()
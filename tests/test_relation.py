@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试关系提取模块
+
+测试关系提取器基类的句子缓存和简单规则关系提取器
+"""
+
+import unittest
+from unittest import mock
+from nlp.relation import SimpleRuleRelationExtractor, Triple
+
+class TestSentenceCache(unittest.TestCase):
+    """测试句子级三元组缓存"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.extractor = SimpleRuleRelationExtractor()
+        self.sentence = '张三访问北京。'
+    
+    def test_failure_not_cached(self):
+        """测试分析失败的结果不放入缓存，再次遇到该句子时重新分析"""
+        triple = Triple('张三', '访问', '北京')
+        with mock.patch.object(self.extractor, '_extract_sentence_triples',
+                               side_effect=[RuntimeError('JVM异常'), [triple]]) as parse:
+            # 第一次分析失败，返回空列表
+            self.assertEqual(self.extractor._cached_sentence_triples(self.sentence), [])
+            self.assertNotIn(self.sentence, self.extractor._sentence_cache)
+            
+            # 第二次分析成功，得到三元组
+            triples = self.extractor._cached_sentence_triples(self.sentence)
+            self.assertEqual([str(t) for t in triples], ['(张三, 访问, 北京)'])
+            
+            # 第三次直接命中缓存
+            triples = self.extractor._cached_sentence_triples(self.sentence)
+            self.assertEqual([str(t) for t in triples], ['(张三, 访问, 北京)'])
+            self.assertEqual(parse.call_count, 2)
+
+
+class TestSimpleRuleRelationExtractor(unittest.TestCase):
+    """测试简单规则关系提取器"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.extractor = SimpleRuleRelationExtractor()
+    
+    def test_extract_triples_deduplicate(self):
+        """测试多个句子中重复的三元组只保留第一次出现，且保持出现顺序"""
+        text = '张三访问北京。李四会见王五。张三访问北京。李四会见王五。'
+        triples = self.extractor.extract_triples(text)
+        self.assertEqual([str(t) for t in triples], ['(张三, 访问, 北京)', '(李四, 会见, 王五)'])
+    
+    def test_extract_triples_keep_first(self):
+        """测试重复三元组保留的是第一次出现的对象"""
+        sentence_triples = {
+            '甲句。': [Triple('张三', '访问', '北京', confidence=0.9)],
+            '乙句。': [Triple('李四', '会见', '王五'), Triple('张三', '访问', '北京', confidence=0.1)],
+        }
+        with mock.patch.object(self.extractor, '_extract_sentence_triples',
+                               side_effect=lambda sentence: sentence_triples[sentence]):
+            triples = self.extractor.extract_triples('甲句。乙句。')
+        
+        self.assertEqual([str(t) for t in triples], ['(张三, 访问, 北京)', '(李四, 会见, 王五)'])
+        self.assertEqual(triples[0].confidence, 0.9)
+    
+    def test_extract_triples_empty(self):
+        """测试空文本"""
+        self.assertEqual(self.extractor.extract_triples(''), [])
+        self.assertEqual(self.extractor.extract_triples(None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
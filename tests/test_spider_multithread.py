@@ -18,7 +18,7 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # 导入项目模块
-from spider.spider import ArticleSpider
+from spider.spider import ArticleSpider, RateLimiter
 
 
 class TestMultithreadSpider(unittest.TestCase):
@@ -147,5 +147,40 @@ class TestMultithreadSpider(unittest.TestCase):
         self.assertGreaterEqual(max_active_threads[0], self.spider.thread_count - 1)
 
 
+class TestRateLimiter(unittest.TestCase):
+    """测试多线程共享的限速器"""
+    
+    def test_shared_rate_across_threads(self):
+        """测试多个线程共享同一速率上限"""
+        limiter = RateLimiter(rate=20, capacity=1)
+        timestamps = []
+        lock = threading.Lock()
+        
+        def worker():
+            for _ in range(3):
+                limiter.acquire()
+                with lock:
+                    timestamps.append(time.monotonic())
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        # 12个请求，首个令牌立即可用，其余11个按每秒20个补充，至少需要0.55秒
+        self.assertEqual(len(timestamps), 12)
+        self.assertGreaterEqual(max(timestamps) - start, 0.5)
+    
+    def test_burst_up_to_capacity(self):
+        """测试桶满时可立即获取不超过容量的令牌"""
+        limiter = RateLimiter(rate=1, capacity=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file